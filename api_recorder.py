@@ -0,0 +1,128 @@
+import base64
+import functools
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+
+# Record/replay of Admin and Data API traffic (see --record and --replay in run_report.py).
+#
+# A cassette is a directory with one JSON file per distinct API call, named after the method
+# and a hash of the serialized request. Each file holds the request (as readable JSON, for
+# inspection), the serialized response, or every item for listing calls that page, and how
+# long the call took. Replaying serves the responses back through the same client methods,
+# so the rest of the code runs exactly as it did, offline and without credentials.
+
+# Client methods that are recorded and replayed.
+RECORDED_METHODS = (
+    "run_report",
+    "batch_run_reports",
+    "list_account_summaries",
+    "list_accounts",
+    "list_properties",
+    "get_property",
+)
+
+# Call options that don't change the response, left out of the interaction key.
+IGNORED_CALL_OPTIONS = ("retry", "timeout", "metadata")
+
+class CassetteMissError(LookupError):
+    """Raised on replay when the cassette has no recording of a request."""
+
+def _interaction_key(method_name, request, kwargs):
+    """Returns the file name stem identifying a call: the method plus a hash of its request and options."""
+    digest = hashlib.sha256(method_name.encode("utf-8"))
+    if isinstance(request, dict):
+        digest.update(json.dumps(request, sort_keys=True).encode("utf-8"))
+    elif request is not None:
+        digest.update(type(request).pb(request).SerializeToString(deterministic=True))
+    for name in sorted(kwargs):
+        if name not in IGNORED_CALL_OPTIONS:
+            digest.update(f"{name}={kwargs[name]!r}".encode("utf-8"))
+    return f"{method_name}-{digest.hexdigest()[:32]}"
+
+def _request_json(request, kwargs):
+    """Returns a request as readable JSON-compatible data, for people inspecting a cassette."""
+    if request is None:
+        return {name: repr(value) for name, value in kwargs.items() if name not in IGNORED_CALL_OPTIONS}
+    if isinstance(request, dict):
+        return request
+    return json.loads(type(request).to_json(request))
+
+def _message_class(type_name):
+    """Returns the proto-plus message class for a 'module:ClassName' type name."""
+    module_name, class_name = type_name.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class RecordingClient:
+    """Wraps a real Admin or Data API client and saves every recorded call to the cassette directory."""
+
+    def __init__(self, client, cassette_dir):
+        self._client = client
+        self._cassette_dir = cassette_dir
+        os.makedirs(cassette_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name in RECORDED_METHODS:
+            return functools.partial(self._record, name, attribute)
+        return attribute
+
+    def _record(self, method_name, method, request=None, **kwargs):
+        started = time.perf_counter()
+        response = method(request=request, **kwargs) if request is not None else method(**kwargs)
+        # Listing calls return pagers; reading every page here means the replay needs no further calls
+        paged = hasattr(response, "pages") or isinstance(response, list)
+        messages = list(response) if paged else [response]
+        latency_seconds = time.perf_counter() - started
+
+        message_class = type(messages[0]) if messages else None
+        entry = {
+            "method": method_name,
+            "request": _request_json(request, kwargs),
+            "recorded_at": time.time(),
+            "latency_seconds": latency_seconds,
+            "paged": paged,
+            "response_type": f"{message_class.__module__}:{message_class.__name__}" if message_class else None,
+            "responses": [base64.b64encode(type(message).serialize(message)).decode("ascii") for message in messages],
+        }
+        filepath = os.path.join(self._cassette_dir, _interaction_key(method_name, request, kwargs) + ".json")
+        temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, filepath)
+        return messages if paged else response
+
+
+class ReplayClient:
+    """Answers recorded Admin and Data API calls from a cassette directory, without credentials or network."""
+
+    def __init__(self, cassette_dir):
+        if not os.path.isdir(cassette_dir):
+            raise FileNotFoundError(f"Cassette directory not found: {cassette_dir}")
+        self._cassette_dir = cassette_dir
+
+    def __getattr__(self, name):
+        if name in RECORDED_METHODS:
+            return functools.partial(self._replay, name)
+        raise AttributeError(name)
+
+    def _replay(self, method_name, request=None, **kwargs):
+        filepath = os.path.join(self._cassette_dir, _interaction_key(method_name, request, kwargs) + ".json")
+        try:
+            with open(filepath, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(
+                f"No recorded {method_name} call matches this request in {self._cassette_dir}. "
+                "Record it with --record (add --no-cache and --refresh-properties to capture every call)."
+            ) from None
+
+        messages = []
+        if entry["response_type"]:
+            message_class = _message_class(entry["response_type"])
+            messages = [message_class.deserialize(base64.b64decode(response)) for response in entry["responses"]]
+        return messages if entry["paged"] else messages[0]
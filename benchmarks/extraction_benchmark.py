@@ -0,0 +1,67 @@
+"""
+Row extraction benchmark.
+
+Times report_engine.extract_response, which reads rows from the raw protobuf message,
+against the same extraction done through the proto-plus wrappers (how every report read
+its rows before), on one large fake response per module in /reports. Both must produce
+the same rows; the script stops if they don't.
+
+    py benchmarks/extraction_benchmark.py
+    py benchmarks/extraction_benchmark.py --rows 250000 --repeats 5
+"""
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import report_engine
+import run_report
+from fake_clients import FakeDataClient
+
+def extract_rows_proto_plus(response):
+    """Reference extraction through the proto-plus wrappers."""
+    return [
+        [value.value for value in row.dimension_values] + [value.value for value in row.metric_values]
+        for row in response.rows
+    ]
+
+def median_seconds(function, repeats):
+    """Returns the median wall time of repeats calls to function."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare protobuf-level and proto-plus row extraction on large fake responses.')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in each response (default: 100000).')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per extraction (default: 3).')
+    args = parser.parse_args()
+
+    data_client = FakeDataClient(rows=args.rows)
+    print(f"Extracting {args.rows:,}-row responses, median of {args.repeats}:")
+    for report in sorted(run_report.get_available_reports().values(), key=lambda report: report["module"]):
+        spec = report_engine.get_spec(importlib.import_module(f"reports.{report['module']}"))
+        if spec is None:
+            continue
+        request = report_engine.build_request(spec, "100000", "2024-01-01", "2024-01-31")
+        request.limit = args.rows
+        response = data_client.run_report(request)
+
+        if report_engine.extract_response(response)["rows"] != extract_rows_proto_plus(response):
+            sys.exit(f"{report['module']}: extract_response returned different rows from the proto-plus extraction.")
+        proto_plus_seconds = median_seconds(lambda: extract_rows_proto_plus(response), args.repeats)
+        protobuf_seconds = median_seconds(lambda: report_engine.extract_response(response), args.repeats)
+        print(f"  {report['module']:<36} proto-plus {proto_plus_seconds * 1000:9.1f} ms  protobuf {protobuf_seconds * 1000:9.1f} ms  "
+              f"{proto_plus_seconds / protobuf_seconds:5.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Offline stand-ins for the GA4 Data and Admin API clients, for benchmarks and local runs without credentials.
+
+FakeDataClient answers run_report and batch_run_reports with real RunReportResponse objects
+built from the request: the requested dimensions and metrics, a configurable number of rows
+with realistic values (dates inside the requested range, source / medium pairs, page paths,
+integer, float and currency metrics), paging through limit and offset, and a property quota
+when the request asks for one. FakeAdminClient lists a configurable number of accounts and
+properties. Install them with ga4_client.install_clients():
+
+    import ga4_client
+    from benchmarks.fake_clients import FakeAdminClient, FakeDataClient
+    ga4_client.install_clients(FakeDataClient(rows=50000, latency=0.2), FakeAdminClient(accounts=50, properties_per_account=10))
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Metric types the API reports for the metrics the reports use; any other metric is an integer.
+METRIC_TYPES = {
+    "engagementRate": "TYPE_FLOAT",
+    "bounceRate": "TYPE_FLOAT",
+    "sessionsPerUser": "TYPE_FLOAT",
+    "conversions": "TYPE_FLOAT",
+    "keyEvents": "TYPE_FLOAT",
+    "averageSessionDuration": "TYPE_SECONDS",
+    "userEngagementDuration": "TYPE_SECONDS",
+    "purchaseRevenue": "TYPE_CURRENCY",
+    "totalRevenue": "TYPE_CURRENCY",
+}
+
+# Values for common dimensions; other dimensions get "<name>-<n>" values.
+DIMENSION_VALUES = {
+    "sessionDefaultChannelGroup": [
+        "Organic Search", "Direct", "Referral", "Paid Search", "Organic Social",
+        "Email", "Unassigned", "Display", "Paid Social", "Organic Video",
+    ],
+    "sessionSourceMedium": [
+        f"{source} / {medium}"
+        for source, medium in [
+            ("google", "organic"), ("(direct)", "(none)"), ("bing", "organic"), ("google", "cpc"),
+            ("facebook.com", "referral"), ("newsletter", "email"), ("linkedin.com", "referral"),
+            ("duckduckgo", "organic"), ("t.co", "referral"), ("yahoo", "organic"),
+        ]
+    ] + [f"partner-{n}.example / referral" for n in range(40)],
+    "deviceCategory": ["desktop", "mobile", "tablet"],
+    "operatingSystem": ["Windows", "iOS", "Android", "Macintosh", "Linux", "Chrome OS"],
+    "browser": ["Chrome", "Safari", "Edge", "Firefox", "Samsung Internet", "Opera"],
+    "country": ["United States", "United Kingdom", "Germany", "India", "Canada", "France", "Australia", "Brazil", "Japan", "Spain"],
+    "city": ["London", "New York", "Berlin", "Mumbai", "Toronto", "Paris", "Sydney", "São Paulo", "Tokyo", "Madrid"] + [f"Town {n}" for n in range(190)],
+}
+
+# Hourly and daily property tokens a fake property starts with, and what each request costs.
+FAKE_TOKENS_PER_DAY = 200000
+FAKE_TOKENS_PER_HOUR = 40000
+FAKE_TOKENS_PER_PROJECT_PER_HOUR = 14000
+FAKE_TOKENS_PER_REQUEST = 10
+
+# The API's row cap when a request sets no limit.
+DEFAULT_API_LIMIT = 10000
+
+def _days(start_date, end_date):
+    """Returns the API 'YYYYMMDD' values of every day in a request's date range."""
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    return [(start + timedelta(days=offset)).strftime('%Y%m%d') for offset in range(max(1, (end - start).days + 1))]
+
+def _dimension_value(dimension, index, days):
+    """Returns the value of a dimension for the index-th combination of its values."""
+    if dimension == "date":
+        return days[index % len(days)]
+    if dimension == "yearMonth":
+        months = sorted({day[:6] for day in days})
+        return months[index % len(months)]
+    if dimension == "pagePath":
+        return f"/{('blog', 'products', 'docs', 'news')[index % 4]}/page-{index}"
+    values = DIMENSION_VALUES.get(dimension)
+    return values[index % len(values)] if values else f"{dimension}-{index}"
+
+
+class FakeDataClient:
+    """
+    Answers Data API report calls with generated RunReportResponses of `rows` rows, after `latency` seconds.
+    Responses are generated once per distinct request and reused, so repeated runs time the code under
+    test rather than the generator. A response carrying a property quota is a copy owned by the calling
+    thread, made once, so concurrent calls never share the quota field and no call copies rows.
+    Rows are sorted by their first metric, largest first.
+    """
+
+    def __init__(self, rows=1000, latency=0.0, seed=0):
+        self.rows = rows
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+        self._responses = {}
+        self._tokens = {} # property -> [tokens left today, this hour, this project this hour]
+        self._lock = threading.Lock()
+        self._thread_responses = threading.local() # .responses: request key -> this thread's copy of the response
+
+    def run_report(self, request=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(request)
+
+    def batch_run_reports(self, request=None, **kwargs):
+        from google.analytics.data_v1beta.types import BatchRunReportsResponse
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return BatchRunReportsResponse(reports=[self._response(report_request) for report_request in request.requests])
+
+    def _response(self, request):
+        """Returns the (cached) response for a request, with a fresh property quota if one was asked for."""
+        from google.analytics.data_v1beta.types import RunReportResponse
+        request_key = (
+            request.property,
+            tuple(dimension.name for dimension in request.dimensions),
+            tuple(metric.name for metric in request.metrics),
+            tuple((date_range.start_date, date_range.end_date) for date_range in request.date_ranges),
+            request.offset,
+            request.limit,
+        )
+        with self._lock:
+            response_pb = self._responses.get(request_key)
+        if response_pb is None:
+            response_pb = self._build_response_pb(request)
+            with self._lock:
+                self._responses[request_key] = response_pb
+
+        if not request.return_property_quota:
+            return RunReportResponse.wrap(response_pb)
+        with self._lock:
+            tokens = self._tokens.setdefault(request.property, [FAKE_TOKENS_PER_DAY, FAKE_TOKENS_PER_HOUR, FAKE_TOKENS_PER_PROJECT_PER_HOUR])
+            tokens[:] = [max(0, left - FAKE_TOKENS_PER_REQUEST) for left in tokens]
+            tokens_left = list(tokens)
+        # The shared response must not carry one call's quota, so the quota goes on this thread's own copy
+        thread_responses = getattr(self._thread_responses, "responses", None)
+        if thread_responses is None:
+            thread_responses = self._thread_responses.responses = {}
+        thread_response_pb = thread_responses.get(request_key)
+        if thread_response_pb is None:
+            thread_response_pb = thread_responses[request_key] = RunReportResponse.pb()()
+            thread_response_pb.CopyFrom(response_pb)
+        response = RunReportResponse.wrap(thread_response_pb)
+        response.property_quota = {
+            "tokens_per_day": {"consumed": FAKE_TOKENS_PER_REQUEST, "remaining": tokens_left[0]},
+            "tokens_per_hour": {"consumed": FAKE_TOKENS_PER_REQUEST, "remaining": tokens_left[1]},
+            "tokens_per_project_per_hour": {"consumed": FAKE_TOKENS_PER_REQUEST, "remaining": tokens_left[2]},
+            "concurrent_requests": {"consumed": 1, "remaining": 9},
+        }
+        return response
+
+    def _build_response_pb(self, request):
+        """Builds the raw protobuf response for one page of a request."""
+        from google.analytics.data_v1beta.types import MetricType, RunReportResponse
+        dimensions = [dimension.name for dimension in request.dimensions]
+        metrics = [metric.name for metric in request.metrics]
+        date_range = request.date_ranges[0] if request.date_ranges else None
+        days = _days(date_range.start_date, date_range.end_date) if date_range else ["20240101"]
+        rng = random.Random(f"{self.seed}:{request.property}:{','.join(dimensions)}:{','.join(metrics)}:{request.offset}")
+
+        response_pb = RunReportResponse.pb()()
+        for dimension in dimensions:
+            response_pb.dimension_headers.add(name=dimension)
+        metric_types = [METRIC_TYPES.get(metric, "TYPE_INTEGER") for metric in metrics]
+        for metric, metric_type in zip(metrics, metric_types):
+            response_pb.metric_headers.add(name=metric, type_=MetricType[metric_type].value)
+
+        limit = request.limit or DEFAULT_API_LIMIT
+        first_row = min(request.offset, self.rows)
+        last_row = min(first_row + limit, self.rows)
+        for index in range(first_row, last_row):
+            row = response_pb.rows.add()
+            for dimension in dimensions:
+                row.dimension_values.add(value=_dimension_value(dimension, index, days))
+            # A long-tailed distribution, so the largest values come first like an ordered report
+            scale = 1_000_000 / (index + 1)
+            for metric_type in metric_types:
+                if metric_type == "TYPE_INTEGER":
+                    value = str(int(scale) + rng.randrange(10))
+                elif metric_type == "TYPE_CURRENCY":
+                    value = f"{scale * 0.37 + rng.random():.2f}"
+                elif metric_type == "TYPE_SECONDS":
+                    value = f"{scale * 41.3 + rng.random():.6f}"
+                else:
+                    value = repr(rng.random())
+                row.metric_values.add(value=value)
+        response_pb.row_count = self.rows
+        return response_pb
+
+
+class FakeAdminClient:
+    """Lists `accounts` accounts of `properties_per_account` properties each, after `latency` seconds per call."""
+
+    def __init__(self, accounts=5, properties_per_account=4, latency=0.0):
+        self.accounts = accounts
+        self.properties_per_account = properties_per_account
+        self.latency = latency
+
+    def _property_ids(self, account_number):
+        return [f"{account_number + 1}{property_number:05d}" for property_number in range(self.properties_per_account)]
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def list_account_summaries(self, request=None, **kwargs):
+        from google.analytics.admin_v1alpha.types import AccountSummary
+        self._wait()
+        return [
+            AccountSummary(
+                account=f"accounts/{account_number + 1}",
+                display_name=f"Account {account_number + 1}",
+                property_summaries=[
+                    {"property": f"properties/{property_id}", "display_name": f"Property {property_id}"}
+                    for property_id in self._property_ids(account_number)
+                ],
+            )
+            for account_number in range(self.accounts)
+        ]
+
+    def list_accounts(self, request=None, **kwargs):
+        from google.analytics.admin_v1alpha.types import Account
+        self._wait()
+        return [Account(name=f"accounts/{account_number + 1}", display_name=f"Account {account_number + 1}") for account_number in range(self.accounts)]
+
+    def list_properties(self, request=None, **kwargs):
+        from google.analytics.admin_v1alpha.types import Property
+        self._wait()
+        account_number = int(request.filter.rsplit("/", 1)[-1]) - 1
+        return [
+            Property(name=f"properties/{property_id}", display_name=f"Property {property_id}", parent=f"accounts/{account_number + 1}")
+            for property_id in self._property_ids(account_number)
+        ]
+
+    def get_property(self, name=None, request=None, **kwargs):
+        from google.analytics.admin_v1alpha.types import Property
+        self._wait()
+        return Property(name=name, display_name=f"Property {name.rsplit('/', 1)[-1]}")
@@ -0,0 +1,78 @@
+"""
+Value formatting benchmark.
+
+Formats a large synthetic report (dimension strings plus integer, float and currency
+metrics) the way the console and HTML outputs do, and compares the per-cell cost of
+the previous approach (try int(float(value)) on every cell, catching the exception for
+every dimension) with the per-column formatters chosen from the report's column types.
+
+    py benchmarks/format_benchmark.py
+    py benchmarks/format_benchmark.py --rows 500000 --repeats 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import output_manager
+import report_table
+
+def legacy_format_value(value):
+    """The previous per-cell formatter: every value is tried as a number."""
+    try:
+        return f"{int(float(value)):,}"
+    except (ValueError, TypeError):
+        return value
+
+def build_report(row_count):
+    """Returns a synthetic report with three dimensions and three typed metrics."""
+    return {
+        "title": "Format Benchmark",
+        "headers": ["Page Path", "Source / Medium", "Country", "Views", "Engagement Seconds", "Revenue"],
+        "column_types": ["string", "string", "string", "integer", "float", "currency"],
+        "rows": [
+            [f"/blog/post-{i % 5000}", f"source-{i % 40} / medium-{i % 7}", f"Country {i % 180}",
+             str(i * 7 % 100000), f"{i * 1.37 % 5000:.6f}", f"{i * 0.91 % 800:.2f}"]
+            for i in range(row_count)
+        ],
+    }
+
+def time_best(function, repeats):
+    """Returns the fastest of several timed calls of function."""
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-cell and per-column value formatting.')
+    parser.add_argument('--rows', type=int, default=200000, help='Number of synthetic rows (default: 200000).')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of timed runs per approach; the fastest is reported (default: 3).')
+    args = parser.parse_args()
+
+    report_data = build_report(args.rows)
+    untyped_report_data = dict(report_data, column_types=None)
+    table = report_table.ReportTable.from_report_data(report_data)
+    cell_count = args.rows * len(report_data["headers"])
+
+    approaches = [
+        ("per-cell try/except (previous)", lambda: [[legacy_format_value(cell) for cell in row] for row in report_data["rows"]]),
+        ("per-column from column types", lambda: list(output_manager._iter_formatted_rows(report_data))),
+        ("per-column from inferred types", lambda: list(output_manager._iter_formatted_rows(untyped_report_data))),
+        ("typed columns (ReportTable)", lambda: list(output_manager._iter_formatted_rows(table))),
+    ]
+
+    print(f"Formatting {args.rows:,} rows x {len(report_data['headers'])} columns ({cell_count:,} cells), best of {args.repeats}:")
+    baseline = None
+    for name, function in approaches:
+        elapsed = time_best(function, max(1, args.repeats))
+        baseline = baseline or elapsed
+        print(f"  {name:<32} {elapsed:7.3f} s  {elapsed / cell_count * 1e9:7.1f} ns/cell  {baseline / elapsed:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Offline benchmark suite.
+
+Runs the reporting pipeline against the synthetic Data and Admin API clients in
+fake_clients.py, so no credentials or network are needed, inside a throwaway working
+directory (its own cache and output folders). Covered:
+
+    parse:<report>          extracting and presenting a response, for every module in /reports
+    run_dynamic_report      run_dynamic_report end to end: API (fake) -> parse -> cache write
+    run_dynamic_report_hit  run_dynamic_report answered from the cache
+    cache_write/cache_read  storing and loading a report in the report cache
+    print_to_console        console output (to /dev/null, no pager)
+    save_to_csv/save_to_html
+    all_properties          --run-all-properties-report over --properties fake properties
+
+Every benchmark runs --repeats times; the median and fastest runs are reported. Use --output
+to save the results as JSON, and --compare to print the speed-up against an earlier results
+file (e.g. one saved on another commit with the same parameters).
+
+    py benchmarks/run_benchmarks.py
+    py benchmarks/run_benchmarks.py --rows 200000 --output before.json
+    py benchmarks/run_benchmarks.py --rows 200000 --compare before.json
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache_store
+import ga4_client
+import output_manager
+import report_engine
+import run_report
+from fake_clients import FakeAdminClient, FakeDataClient
+
+BENCHMARK_PROPERTY_ID = "100000"
+BENCHMARK_START_DATE = "2024-01-01"
+BENCHMARK_END_DATE = "2024-01-31"
+BENCHMARK_PROPERTY_INFO = {"display_name": "Benchmark Property", "property_id": BENCHMARK_PROPERTY_ID}
+
+def _git_commit():
+    """Returns (commit hash, True if the working tree has uncommitted changes), or (None, None) outside a git checkout."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+def time_runs(function, repeats):
+    """Calls function repeats times with its output silenced, returning the wall time of each call."""
+    timings = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for _ in range(repeats):
+            with contextlib.redirect_stdout(devnull):
+                started = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - started)
+    return timings
+
+def build_benchmarks(args):
+    """Returns a list of (name, function, rows per call) for every benchmark, after installing the fake clients."""
+    data_client = FakeDataClient(rows=args.rows, latency=args.latency_ms / 1000)
+    ga4_client.install_clients(data_client, FakeAdminClient())
+    benchmarks = []
+
+    # Parsing, per report module: one response from the fake client, extracted and presented each run
+    for report in sorted(run_report.get_available_reports().values(), key=lambda report: report["module"]):
+        spec = report_engine.get_spec(importlib.import_module(f"reports.{report['module']}"))
+        if spec is None:
+            continue
+        response = data_client.run_report(report_engine.build_request(spec, BENCHMARK_PROPERTY_ID, BENCHMARK_START_DATE, BENCHMARK_END_DATE))
+        benchmarks.append((
+            f"parse:{report['module']}",
+            lambda spec=spec, response=response: report_engine.present(spec, report_engine.table_from_raw(report_engine.extract_response(response))),
+            len(response.rows),
+        ))
+
+    def run_report_uncached():
+        return run_report.run_dynamic_report(args.report, BENCHMARK_PROPERTY_ID, BENCHMARK_START_DATE, BENCHMARK_END_DATE, no_cache=True)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        report_data = run_report_uncached() # Also primes the cache for the cache-hit benchmark
+    if not report_data:
+        raise RuntimeError(f"The benchmark report '{args.report}' returned no data.")
+    report_data['date_range'] = f"{BENCHMARK_START_DATE} to {BENCHMARK_END_DATE}"
+    rows = len(report_data['rows'])
+
+    benchmarks.append(("run_dynamic_report", run_report_uncached, rows))
+    benchmarks.append((
+        "run_dynamic_report_hit",
+        lambda: run_report.run_dynamic_report(args.report, BENCHMARK_PROPERTY_ID, BENCHMARK_START_DATE, BENCHMARK_END_DATE),
+        rows,
+    ))
+
+    store = cache_store.get_cache_store()
+    cache_entry = report_data.to_cache()
+    benchmarks.append(("cache_write", lambda: store.set("benchmark-entry", cache_entry, ttl=None), rows))
+    benchmarks.append(("cache_read", lambda: store.get("benchmark-entry"), rows))
+
+    benchmarks.append(("print_to_console", lambda: output_manager.print_to_console(report_data, BENCHMARK_PROPERTY_INFO, use_pager=False), rows))
+    benchmarks.append(("save_to_csv", lambda: output_manager.save_to_csv(report_data, BENCHMARK_PROPERTY_INFO, BENCHMARK_START_DATE, BENCHMARK_END_DATE), rows))
+    benchmarks.append(("save_to_html", lambda: output_manager.save_to_html(report_data, BENCHMARK_PROPERTY_INFO, BENCHMARK_START_DATE, BENCHMARK_END_DATE), rows))
+
+    if args.properties:
+        def run_all_properties():
+            # Each run starts from an empty cache and its own clients, so every property is fetched
+            ga4_client.install_clients(
+                FakeDataClient(rows=args.property_rows, latency=args.latency_ms / 1000),
+                FakeAdminClient(accounts=args.properties, properties_per_account=1),
+            )
+            run_report.run_report_for_all_properties(no_cache=True, workers=args.workers, refresh_properties=True)
+        benchmarks.append(("all_properties", run_all_properties, args.properties * args.property_rows))
+
+    return benchmarks
+
+def compare(results, baseline_path):
+    """Prints each benchmark's median against the same benchmark in a saved results file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("parameters") != results["parameters"]:
+        print(f"Warning: {baseline_path} was run with different parameters {baseline.get('parameters')}; timings aren't directly comparable.")
+    print(f"\nAgainst {baseline_path} (commit {(baseline.get('commit') or 'unknown')[:12]}):")
+    for name, result in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            print(f"  {name:<44} (new)")
+            continue
+        ratio = previous["median_seconds"] / result["median_seconds"] if result["median_seconds"] else float("inf")
+        print(f"  {name:<44} {previous['median_seconds'] * 1000:10.2f} ms -> {result['median_seconds'] * 1000:10.2f} ms  {ratio:5.2f}x {'faster' if ratio >= 1 else 'slower'}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the reporting pipeline offline against synthetic API clients.')
+    parser.add_argument('--rows', type=int, default=20000, help='Rows per fake report response (default: 20000).')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated latency of each fake API call, in milliseconds (default: 0).')
+    parser.add_argument('--report', type=str, default='traffic_acquisition_report', help='Report used for the end-to-end, cache and output benchmarks (default: traffic_acquisition_report).')
+    parser.add_argument('--properties', type=int, default=500, help='Fake properties for the all-properties benchmark; 0 skips it (default: 500).')
+    parser.add_argument('--property-rows', type=int, default=200, help='Rows per property in the all-properties benchmark (default: 200).')
+    parser.add_argument('--workers', type=int, default=run_report.ALL_PROPERTIES_WORKERS, help=f'Workers for the all-properties benchmark (default: {run_report.ALL_PROPERTIES_WORKERS}).')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark (default: 3).')
+    parser.add_argument('--only', type=str, help='Run only the benchmarks whose name contains this text.')
+    parser.add_argument('--output', type=str, help='Save the results as JSON to this path.')
+    parser.add_argument('--compare', type=str, metavar='RESULTS_JSON', help='Compare against results saved earlier with --output.')
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    # The all-properties run asks for a date range interactively; benchmarks always use the same one
+    run_report.get_selected_date_range = lambda *_: (
+        BENCHMARK_START_DATE, BENCHMARK_END_DATE, "Benchmark range", f"{BENCHMARK_START_DATE} to {BENCHMARK_END_DATE}"
+    )
+
+    commit, dirty = _git_commit()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "rows": args.rows,
+            "latency_ms": args.latency_ms,
+            "report": args.report,
+            "properties": args.properties,
+            "property_rows": args.property_rows,
+            "workers": args.workers,
+            "repeats": args.repeats,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        benchmarks = [benchmark for benchmark in build_benchmarks(args) if not args.only or args.only in benchmark[0]]
+        print(f"{len(benchmarks)} benchmarks, {args.rows:,} rows per response, {args.latency_ms:g} ms latency, best and median of {args.repeats}:")
+        for name, function, rows in benchmarks:
+            timings = time_runs(function, max(1, args.repeats))
+            median_seconds = statistics.median(timings)
+            results["results"][name] = {
+                "median_seconds": median_seconds,
+                "min_seconds": min(timings),
+                "runs": len(timings),
+                "rows": rows,
+                "rows_per_second": rows / median_seconds if median_seconds else None,
+            }
+            print(f"  {name:<44} {median_seconds * 1000:10.2f} ms median  {min(timings) * 1000:10.2f} ms best  {rows / median_seconds if median_seconds else 0:14,.0f} rows/s")
+        os.chdir(REPO_DIR)
+        ga4_client.reset_client_pool()
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {output_path}")
+    if compare_path:
+        compare(results, compare_path)
+
+if __name__ == "__main__":
+    main()
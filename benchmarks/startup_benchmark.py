@@ -0,0 +1,138 @@
+"""
+Startup benchmark for cache-hit runs.
+
+Seeds a throwaway working directory with a cached property catalogue and a cached
+report, then runs run_report.py non-interactively against it in a fresh interpreter.
+The run must be answered from the cache without importing grpc or the Google client
+libraries, and must finish within the time budget. Exits with status 1 otherwise.
+
+    py benchmarks/startup_benchmark.py
+    py benchmarks/startup_benchmark.py --budget-ms 500 --repeats 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Modules a cache-hit run must never load.
+HEAVY_MODULES = ("grpc", "google.analytics", "google.api_core", "google.protobuf", "google.auth", "proto")
+
+BENCHMARK_PROPERTY_ID = "100000001"
+BENCHMARK_REPORT = "top_pages_report"
+BENCHMARK_START_DATE = "2024-01-01"
+BENCHMARK_END_DATE = "2024-01-31"
+
+# Runs inside the child interpreter: times the import and the full run, then records what was loaded.
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {repo_dir!r})
+import run_report
+imported = time.perf_counter()
+sys.argv = ["run_report.py", "-p", {property_id!r}, "-r", {report!r}, "-sd", {start_date!r}, "-ed", {end_date!r}, "-o", "console"]
+run_report.main()
+finished = time.perf_counter()
+with open({result_path!r}, "w") as f:
+    json.dump({{
+        "import_seconds": imported - started,
+        "run_seconds": finished - started,
+        "modules": sorted(sys.modules),
+    }}, f)
+"""
+
+def seed_cache(work_dir):
+    """Writes a catalogue and a cached report table into work_dir/cache, as a previous run would have."""
+    import importlib
+    import cache_store
+    import property_catalogue
+    import report_engine
+
+    os.chdir(work_dir)
+    property_catalogue._save_catalogue({
+        "fetched_at": time.time(),
+        "accounts": [{
+            "name": "accounts/1",
+            "display_name": "Benchmark Account",
+            "properties": [{"display_name": "Benchmark Property", "property_id": BENCHMARK_PROPERTY_ID}],
+        }],
+    })
+
+    # Stored the way run_dynamic_reports stores it: the parsed table's columnar cache form under the request fingerprint
+    spec = report_engine.get_spec(importlib.import_module(f"reports.{BENCHMARK_REPORT}"))
+    request_fields = report_engine.build_request_fields(spec, BENCHMARK_PROPERTY_ID, BENCHMARK_START_DATE, BENCHMARK_END_DATE)
+    raw_table = report_engine.table_from_raw({
+        "dimension_headers": list(spec["dimensions"]),
+        "metric_headers": list(spec["metrics"]),
+        "metric_types": ["TYPE_INTEGER"] * len(spec["metrics"]),
+        "rows": [[f"/page-{i}", str(1000 - i)] for i in range(spec.get("limit", 25))],
+        "row_count": spec.get("limit", 25),
+    })
+    cache_store.get_cache_store().set(report_engine.request_fingerprint(request_fields), raw_table.to_cache(), ttl=None)
+
+def run_once(work_dir):
+    """Runs one cache-hit report in a fresh interpreter and returns its measurements."""
+    result_path = os.path.join(work_dir, "result.json")
+    child_script = CHILD_SCRIPT.format(
+        repo_dir=REPO_DIR,
+        property_id=BENCHMARK_PROPERTY_ID,
+        report=BENCHMARK_REPORT,
+        start_date=BENCHMARK_START_DATE,
+        end_date=BENCHMARK_END_DATE,
+        result_path=result_path,
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", child_script], cwd=work_dir, capture_output=True, text=True
+    )
+    if completed.returncode != 0 or not os.path.exists(result_path):
+        print(completed.stdout)
+        print(completed.stderr)
+        raise RuntimeError("The benchmark run failed.")
+    with open(result_path, encoding='utf-8') as f:
+        result = json.load(f)
+    os.remove(result_path)
+    result["served_from_cache"] = "Loading report from cache" in completed.stdout
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the startup time of a run answered from the cache.')
+    parser.add_argument('--budget-ms', type=float, default=400, help='Maximum median wall time of a cache-hit run, in milliseconds (default: 400).')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of runs to time (default: 5).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        seed_cache(work_dir)
+        results = [run_once(work_dir) for _ in range(max(1, args.repeats))]
+
+    import_ms = sorted(result["import_seconds"] * 1000 for result in results)
+    run_ms = sorted(result["run_seconds"] * 1000 for result in results)
+    median_import_ms = import_ms[len(import_ms) // 2]
+    median_run_ms = run_ms[len(run_ms) // 2]
+    heavy_modules = sorted({
+        module for result in results for module in result["modules"]
+        if any(module == heavy or module.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    })
+
+    print(f"Cache-hit run over {len(results)} runs: import {median_import_ms:.1f} ms, total {median_run_ms:.1f} ms (median), budget {args.budget_ms:.0f} ms")
+
+    failures = []
+    if not all(result["served_from_cache"] for result in results):
+        failures.append("the report was not served from the cache")
+    if heavy_modules:
+        failures.append(f"heavy modules were imported: {', '.join(heavy_modules[:10])}{' ...' if len(heavy_modules) > 10 else ''}")
+    if median_run_ms > args.budget_ms:
+        failures.append(f"median run time {median_run_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("PASS: served from the cache without loading grpc or the Google client libraries.")
+
+if __name__ == "__main__":
+    main()
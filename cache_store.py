@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+import profiler
+
+from settings import ( # Import cache settings from settings.py
+    CACHE_BACKEND, CACHE_DURATION, CACHE_MAX_BYTES,
+    CACHE_TTL_TODAY, CACHE_TTL_PROCESSING_LAG, CACHE_TTL_CLOSED, GA4_PROCESSING_LAG_DAYS
+)
+
+CACHE_DIR = "cache"
+SQLITE_CACHE_PATH = os.path.join(CACHE_DIR, "cache.sqlite3")
+
+# Cache entries are JSON-serialisable values stored under a string key. Every
+# backend offers the same small interface:
+#
+#   get(key)                   -> value, or None if missing or expired
+#   set(key, value, ttl=...)   -> stores value for ttl seconds (None keeps it until evicted)
+#   describe(key)              -> where an entry lives, for log messages
+#   cleanup()                  -> removes expired entries
+
+def ttl_for_end_date(end_date):
+    """
+    Returns how long, in seconds, to cache data for a range ending on end_date ('YYYY-MM-DD'),
+    or None to keep it until evicted. Ranges reaching today are refreshed soonest, ranges
+    ending within GA4_PROCESSING_LAG_DAYS a little later, and closed ranges are kept.
+    """
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    today = date.today()
+    if end >= today:
+        return CACHE_TTL_TODAY
+    if end >= today - timedelta(days=GA4_PROCESSING_LAG_DAYS):
+        return CACHE_TTL_PROCESSING_LAG
+    return CACHE_TTL_CLOSED
+
+# The shortest lifetime any entry can be given. Directory cleanup only opens files older than this.
+_SHORTEST_TTL = min(ttl for ttl in (CACHE_DURATION, CACHE_TTL_TODAY, CACHE_TTL_PROCESSING_LAG, CACHE_TTL_CLOSED) if ttl is not None)
+
+class DirectoryCacheStore:
+    """The original layout: one JSON file per entry, named by its key, in the cache directory."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def describe(self, key):
+        """Returns the file path of an entry."""
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired."""
+        filepath = self.describe(key)
+        if not os.path.exists(filepath):
+            profiler.count("cache_misses")
+            return None
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"Error loading cache file: {e}. Re-running report.")
+            profiler.count("cache_misses")
+            return None
+
+        expires_at, value = self._unwrap(entry, filepath)
+        if expires_at is not None and time.time() >= expires_at:
+            profiler.count("cache_stale")
+            return None
+        profiler.count("cache_hits")
+        return value
+
+    def set(self, key, value, ttl=CACHE_DURATION):
+        """Writes an entry through a temporary file so concurrent readers never see a partial file."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        filepath = self.describe(key)
+        temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        entry = {
+            "expires_at": time.time() + ttl if ttl is not None else None,
+            "value": value
+        }
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, filepath)
+
+    def cleanup(self):
+        """Deletes expired cache files from the cache directory."""
+        if not os.path.exists(self.cache_dir):
+            return
+
+        current_time = time.time()
+        for filename in os.listdir(self.cache_dir):
+            filepath = os.path.join(self.cache_dir, filename)
+            if not filename.endswith(".json") or not os.path.isfile(filepath):
+                continue
+            # Only files older than the shortest TTL can have expired,
+            # so newer ones are skipped without being opened.
+            if (current_time - os.path.getmtime(filepath)) <= _SHORTEST_TTL:
+                continue
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    expires_at, _ = self._unwrap(json.load(f), filepath)
+            except Exception:
+                expires_at = 0 # Unreadable files are removed
+            if expires_at is not None and current_time >= expires_at:
+                try:
+                    os.remove(filepath)
+                    print(f"Cleaned up stale cache file: {filepath}")
+                except Exception as e:
+                    print(f"Error cleaning up cache file {filepath}: {e}")
+
+    @staticmethod
+    def _unwrap(entry, filepath):
+        """Returns (expires_at, value) for an entry, treating files from before expiry tracking as mtime-based."""
+        if isinstance(entry, dict) and set(entry) == {"expires_at", "value"}:
+            return entry["expires_at"], entry["value"]
+        return os.path.getmtime(filepath) + CACHE_DURATION, entry
+
+
+class SQLiteCacheStore:
+    """
+    All entries in one indexed SQLite file, with compressed values.
+    Tracks each entry's size and last access, and evicts the least recently used
+    entries once the total size passes max_bytes. Writes are transactional, so
+    concurrent processes (e.g. overlapping cron runs) can't corrupt entries.
+    """
+
+    def __init__(self, db_path=SQLITE_CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        # sqlite3 connections can't be shared between threads, so each thread gets its own
+        self._local = threading.local()
+
+    def _connect(self):
+        """Returns this thread's connection, creating the database schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries ("
+                    " key TEXT PRIMARY KEY,"
+                    " size INTEGER NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " last_access REAL NOT NULL,"
+                    " expires_at REAL,"
+                    " value BLOB NOT NULL)"
+                )
+                # (last_access, size) serves LRU ordering without reading values
+                connection.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (last_access, size)")
+                connection.execute("CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (expires_at)")
+                # The total size is kept in cache_stats by triggers, in the same transaction as each
+                # write, so checking the budget is a single-row read instead of a scan of every entry
+                connection.execute("CREATE TABLE IF NOT EXISTS cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+                connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS cache_entries_size_insert AFTER INSERT ON cache_entries BEGIN"
+                    " UPDATE cache_stats SET value = value + NEW.size WHERE name = 'total_bytes'; END"
+                )
+                connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS cache_entries_size_update AFTER UPDATE OF size ON cache_entries BEGIN"
+                    " UPDATE cache_stats SET value = value + NEW.size - OLD.size WHERE name = 'total_bytes'; END"
+                )
+                connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS cache_entries_size_delete AFTER DELETE ON cache_entries BEGIN"
+                    " UPDATE cache_stats SET value = value - OLD.size WHERE name = 'total_bytes'; END"
+                )
+                # Counts entries written before the counter existed, once
+                connection.execute(
+                    "INSERT OR IGNORE INTO cache_stats (name, value)"
+                    " SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM cache_entries"
+                )
+            self._local.connection = connection
+        return connection
+
+    def describe(self, key):
+        """Returns the database path and key of an entry."""
+        return f"{self.db_path} [{key[:16]}]"
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired, and records the access."""
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            profiler.count("cache_misses")
+            return None
+
+        value, expires_at = row
+        current_time = time.time()
+        if expires_at is not None and current_time >= expires_at:
+            profiler.count("cache_stale")
+            return None
+        profiler.count("cache_hits")
+        try:
+            with connection:
+                connection.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (current_time, key))
+        except sqlite3.OperationalError:
+            pass # Another process holds the write lock; the access time is only a hint
+        return json.loads(zlib.decompress(value).decode('utf-8'))
+
+    def set(self, key, value, ttl=CACHE_DURATION):
+        """Stores an entry and evicts least recently used entries if the store is over budget."""
+        blob = zlib.compress(json.dumps(value).encode('utf-8'))
+        current_time = time.time()
+        expires_at = current_time + ttl if ttl is not None else None
+        connection = self._connect()
+        with connection:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete wouldn't fire the size triggers
+            connection.execute(
+                "INSERT INTO cache_entries (key, size, created_at, last_access, expires_at, value)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET size = excluded.size, created_at = excluded.created_at,"
+                " last_access = excluded.last_access, expires_at = excluded.expires_at, value = excluded.value",
+                (key, len(blob), current_time, current_time, expires_at, blob)
+            )
+            self._evict(connection)
+
+    def cleanup(self):
+        """Deletes expired entries using the expiry index, without scanning the store."""
+        if not os.path.exists(self.db_path):
+            return
+        connection = self._connect()
+        with connection:
+            deleted = connection.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            ).rowcount
+        if deleted:
+            print(f"Cleaned up {deleted} stale cache entr{'y' if deleted == 1 else 'ies'} from {self.db_path}")
+
+    def _evict(self, connection):
+        """Deletes least recently used entries until the total size is within max_bytes."""
+        if not self.max_bytes:
+            return
+        total_bytes = connection.execute("SELECT value FROM cache_stats WHERE name = 'total_bytes'").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        evicted_keys = []
+        for key, size in connection.execute("SELECT key, size FROM cache_entries ORDER BY last_access"):
+            if total_bytes <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total_bytes -= size
+        connection.executemany("DELETE FROM cache_entries WHERE key = ?", evicted_keys)
+        print(f"Evicted {len(evicted_keys)} least recently used cache entr{'y' if len(evicted_keys) == 1 else 'ies'} to stay under the cache size budget.")
+
+
+CACHE_BACKENDS = {
+    "directory": DirectoryCacheStore,
+    "sqlite": SQLiteCacheStore,
+}
+
+_store_lock = threading.Lock()
+_store = None
+
+def get_cache_store():
+    """Returns the process-wide cache store for the backend selected by CACHE_BACKEND in settings.py."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if CACHE_BACKEND not in CACHE_BACKENDS:
+                raise ValueError(f"Unknown cache backend '{CACHE_BACKEND}'. Choose from: {', '.join(CACHE_BACKENDS)}.")
+            _store = CACHE_BACKENDS[CACHE_BACKEND]()
+        return _store
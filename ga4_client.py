@@ -1,21 +1,111 @@
-from google.analytics.admin_v1alpha import AnalyticsAdminServiceClient
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.oauth2 import service_account
 import os
+import threading
+
+import api_recorder
+import profiler
+import quota_manager
+
+# The Google client libraries (and the grpc and protobuf stacks beneath them) take
+# a noticeable share of startup time, so they are only imported once a client is
+# actually needed. Runs answered entirely from the cache never load them.
+
+# Process-wide pool of credentials and API clients.
+# The service account file is read once; each client is built once and keeps a
+# long-lived gRPC channel whose credentials google-auth refreshes in place when
+# the access token expires. The clients are safe to share between threads.
+_pool_lock = threading.Lock()
+_credentials = None
+_clients = {}
+_pool_stats = {
+    "credentials_loaded": 0,
+    "channels_created": 0,
+    "channels_reused": 0,
+}
+# Cassette directory that new clients record their calls to (see start_recording), or None.
+_record_dir = None
 
 def get_admin_client():
     """Returns an authenticated Google Analytics Admin API client."""
-    credentials = _load_credentials()
-    if credentials:
-        return AnalyticsAdminServiceClient(credentials=credentials)
-    return None
+    def build_client(credentials):
+        from google.analytics.admin_v1alpha import AnalyticsAdminServiceClient
+        return _recorded(AnalyticsAdminServiceClient(credentials=credentials))
+    return _get_pooled_client("admin", build_client)
 
 def get_data_client():
     """Returns an authenticated Google Analytics Data API client."""
-    credentials = _load_credentials()
-    if credentials:
-        return BetaAnalyticsDataClient(credentials=credentials)
-    return None
+    def build_client(credentials):
+        from google.analytics.data_v1beta import BetaAnalyticsDataClient
+        # Report calls are throttled against the property quota and retried (see quota_manager.py)
+        return quota_manager.QuotaAwareDataClient(_recorded(BetaAnalyticsDataClient(credentials=credentials)))
+    return _get_pooled_client("data", build_client)
+
+def get_pool_stats():
+    """Returns a copy of the client pool counters (credentials loaded, channels created and reused)."""
+    with _pool_lock:
+        return dict(_pool_stats)
+
+def reset_client_pool():
+    """Drops the pooled credentials and clients so the next call builds fresh ones."""
+    global _credentials
+    with _pool_lock:
+        for client in _clients.values():
+            try:
+                client.transport.close()
+            except Exception:
+                pass
+        _clients.clear()
+        _credentials = None
+
+def install_clients(data_client=None, admin_client=None):
+    """
+    Puts ready-made clients (e.g. the stand-ins in benchmarks/fake_clients.py) in the pool, so the
+    rest of the code uses them without loading credentials. The data client is wrapped for the
+    quota manager like a real one. reset_client_pool() removes them again.
+    """
+    with _pool_lock:
+        if data_client is not None:
+            _clients["data"] = quota_manager.QuotaAwareDataClient(data_client)
+        if admin_client is not None:
+            _clients["admin"] = admin_client
+
+def start_recording(cassette_dir):
+    """Saves every Admin and Data API call made by clients created from now on to cassette_dir (see api_recorder.py)."""
+    global _record_dir
+    with _pool_lock:
+        _record_dir = cassette_dir
+    print(f"Recording API calls to {cassette_dir}")
+
+def start_replay(cassette_dir):
+    """Answers every Admin and Data API call from a cassette recorded with start_recording, without credentials."""
+    replay_client = api_recorder.ReplayClient(cassette_dir)
+    install_clients(data_client=replay_client, admin_client=replay_client)
+    print(f"Replaying API calls from {cassette_dir}")
+
+def _recorded(client):
+    """Returns client wrapped to record its calls if recording is on, otherwise client itself."""
+    return api_recorder.RecordingClient(client, _record_dir) if _record_dir else client
+
+def _get_pooled_client(client_key, client_factory):
+    """Returns the pooled client for client_key, creating it (and its channel) on first use."""
+    global _credentials
+    with _pool_lock:
+        client = _clients.get(client_key)
+        if client is not None:
+            _pool_stats["channels_reused"] += 1
+            return client
+
+        if _credentials is None:
+            with profiler.phase("credentials"):
+                _credentials = _load_credentials()
+            if not _credentials:
+                return None
+            _pool_stats["credentials_loaded"] += 1
+
+        with profiler.phase("client_setup"):
+            client = client_factory(credentials=_credentials)
+        _clients[client_key] = client
+        _pool_stats["channels_created"] += 1
+        return client
 
 def _load_credentials():
     """Loads credentials from the client_secret.json file."""
@@ -31,9 +121,9 @@ def _load_credentials():
         return None
 
     try:
+        from google.oauth2 import service_account
         credentials = service_account.Credentials.from_service_account_file(credentials_path)
         return credentials
     except Exception as e:
         print(f"Error loading credentials: {e}")
         return None
-
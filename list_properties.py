@@ -1,7 +1,11 @@
-from google.analytics.admin_v1alpha.types import ListPropertiesRequest
 import ga4_client # Import our new client module
+import property_catalogue
+import argparse
+import time
 
-def list_accounts_and_properties():
+from settings import PROPERTY_ENUMERATION_METHOD # Import PROPERTY_ENUMERATION_METHOD from settings.py
+
+def list_accounts_and_properties(method=PROPERTY_ENUMERATION_METHOD):
     """Lists GA4 accounts and then properties accessible by the authenticated service account."""
     client = ga4_client.get_admin_client()
     if not client:
@@ -9,11 +13,11 @@ def list_accounts_and_properties():
 
     print("Listing GA4 Accounts and Properties:")
 
+    accounts = property_catalogue.fetch_accounts_and_properties(client, method=method)
+
     # First, list all accessible accounts
-    accounts = []
-    for account in client.list_accounts():
-        accounts.append(account)
-        print(f"Account Name: {account.display_name} ({account.name})")
+    for account in accounts:
+        print(f"Account Name: {account['display_name']} ({account['name']})")
 
     if not accounts:
         print("No GA4 accounts found that are accessible by this service account.")
@@ -21,20 +25,46 @@ def list_accounts_and_properties():
 
     # Now, for each account, list its properties
     for account in accounts:
-        print(f"\nProperties for Account: {account.display_name} ({account.name})")
-        # Create a ListPropertiesRequest filtered by the current account
-        request = ListPropertiesRequest(
-            filter=f"ancestor:{account.name}"
-        )
-
-        properties_found = False
-        for property_ in client.list_properties(request=request):
-            properties_found = True
-            print(f"  Property Name: {property_.display_name} ({property_.name})")
+        print(f"\nProperties for Account: {account['display_name']} ({account['name']})")
+
+        for property_ in account['properties']:
+            print(f"  Property Name: {property_['display_name']} (properties/{property_['property_id']})")
         
-        if not properties_found:
-            print(f"  No properties found for account {account.display_name}.")
+        if not account['properties']:
+            print(f"  No properties found for account {account['display_name']}.")
+
+def compare_enumeration_methods(repeats=1):
+    """Times each Admin API enumeration method against the original sequential path."""
+    client = ga4_client.get_admin_client()
+    if not client:
+        return
+
+    print(f"Timing account and property enumeration ({repeats} run(s) per method):")
+    timings = {}
+    for method in property_catalogue.ENUMERATION_METHODS:
+        durations = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            accounts = property_catalogue.fetch_accounts_and_properties(client, method=method)
+            durations.append(time.perf_counter() - start_time)
+        timings[method] = min(durations)
+        property_count = sum(len(account['properties']) for account in accounts)
+        print(f"  {method:<10} {timings[method]:8.3f}s  ({len(accounts)} accounts, {property_count} properties)")
+
+    sequential_time = timings["sequential"]
+    for method, duration in timings.items():
+        if method != "sequential" and duration > 0:
+            print(f"  {method} is {sequential_time / duration:.1f}x the speed of sequential.")
 
 
 if __name__ == "__main__":
-    list_accounts_and_properties()
+    parser = argparse.ArgumentParser(description='List GA4 accounts and properties.')
+    parser.add_argument('--method', type=str, choices=property_catalogue.ENUMERATION_METHODS, help='Admin API enumeration method (defaults to PROPERTY_ENUMERATION_METHOD in settings.py).')
+    parser.add_argument('--compare', action='store_true', help='Time every enumeration method against the sequential path instead of listing.')
+    parser.add_argument('--repeats', type=int, default=1, help='Number of timed runs per method with --compare; the fastest is reported.')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_enumeration_methods(repeats=args.repeats)
+    else:
+        list_accounts_and_properties(method=args.method or PROPERTY_ENUMERATION_METHOD)
@@ -1,8 +1,19 @@
 import csv
+import json
 import os
 import time
 import re
 import datetime
+import gzip
+import html
+import itertools
+import shutil
+import subprocess
+import sys
+import profiler
+import report_table
+
+from settings import EXPORT_CHUNK_ROWS, HTML_EMBED_JSON_MIN_ROWS, HTML_PAGE_SIZE # Import output settings from settings.py
 
 def _sanitize_name(name):
     """Converts a string to a sanitized, hyphenated, lowercase format for filenames/directories."""
@@ -13,94 +24,294 @@ def _sanitize_name(name):
     name = name.strip('-')
     return name
 
-def _format_value(value):
-    """Tries to format a value as an integer with commas, otherwise returns the original value."""
+def _format_integer(value):
+    """Formats an integer value with thousands separators ('1234' -> '1,234')."""
     try:
-        # Convert to float first to handle string representations of numbers like "1234.0"
-        return f"{int(float(value)):,}"
+        return f"{int(value):,}"
+    except (ValueError, TypeError):
+        return _format_float(value)
+
+def _format_float(value):
+    """Formats a decimal value with thousands separators and two decimal places ('1234.5678' -> '1,234.57')."""
+    try:
+        return f"{float(value):,.2f}"
     except (ValueError, TypeError):
         return value
 
-def _generate_table_html(headers, rows):
-    """Generates an HTML table string from headers and rows, with number formatting."""
-    
-    # Format numbers in rows
-    formatted_rows = []
+# Display formatter for each column type in report data's "column_types".
+# Percent columns are already formatted by the report spec and strings are shown as they are.
+COLUMN_FORMATTERS = {
+    "integer": _format_integer,
+    "float": _format_float,
+    "currency": _format_float,
+    "percent": None,
+    "string": None,
+}
+
+# Number of rows inspected to infer column types for reports that don't provide them.
+COLUMN_TYPE_SAMPLE_ROWS = 100
+
+def _infer_column_types(headers, rows):
+    """
+    Infers column types from a sample of rows, for report data without "column_types"
+    (e.g. reports with their own run_report, or reports cached by an older version).
+    """
+    sample = rows[:COLUMN_TYPE_SAMPLE_ROWS]
+    column_types = []
+    for index in range(len(headers)):
+        values = [row[index] for row in sample if index < len(row) and row[index] not in ("", None)]
+        column_type = "string"
+        if values:
+            for candidate_type, parse in (("integer", int), ("float", float)):
+                try:
+                    for value in values:
+                        parse(value)
+                except (ValueError, TypeError):
+                    continue
+                column_type = candidate_type
+                break
+        column_types.append(column_type)
+    return column_types
+
+def _get_column_formatters(headers, column_types, sample_rows):
+    """
+    Returns the display formatter for each column (None where values are shown as they are).
+    Columns whose type is missing or None are inferred from the sample rows.
+    """
+    if not column_types or None in column_types:
+        inferred_types = _infer_column_types(headers, sample_rows)
+        column_types = [inferred_type if not column_types or column_types[index] is None else column_types[index]
+                        for index, inferred_type in enumerate(inferred_types)]
+    return [COLUMN_FORMATTERS.get(column_type) for column_type in column_types]
+
+def _format_rows(column_formatters, rows):
+    """Yields rows with each column's formatter applied, leaving unformatted columns as they are."""
+    formatted_columns = [(index, formatter) for index, formatter in enumerate(column_formatters) if formatter]
     for row in rows:
-        formatted_rows.append([_format_value(cell) for cell in row])
-        
-    table_html = """
-    <table class="table table-striped table-bordered">
-        <thead>
-            <tr>
-                {}
-            </tr>
-        </thead>
-        <tbody>
-            {}
-        </tbody>
-    </table>
-    """.format(
-        ''.join(f'<th>{header}</th>' for header in headers),
-        ''.join(f'<tr>{"".join(f"<td>{cell}</td>" for cell in row)}</tr>' for row in formatted_rows)
-    )
-    return table_html
-
-def print_to_console(report_data, selected_property_info=None, start_date=None, end_date=None): # Match signature
-    """Prints the report data in a formatted table to the console."""
+        if formatted_columns:
+            row = list(row)
+            for index, formatter in formatted_columns:
+                row[index] = formatter(row[index])
+        yield row
+
+# Display formatting runs this many rows at a time, each chunk timed as the "format" profiler phase.
+FORMAT_CHUNK_ROWS = 1000
+
+def _iter_formatted_rows(report_data, limit=None):
+    """
+    Yields the report's rows with each column formatted for display, resolving the formatters once.
+    limit stops after that many rows, before any further rows are read or formatted.
+    """
+    if isinstance(report_data, report_table.ReportTable):
+        # Typed columns are formatted straight from their numbers, without reparsing strings
+        return _time_formatting(report_data.iter_display_rows(), limit)
+
+    rows = report_data.get("rows", [])
+    if hasattr(rows, "__len__"):
+        sample_rows = rows
+    else:
+        # Rows from an iterator (see --stream): read a sample to infer any missing column types
+        rows = iter(rows)
+        sample_rows = list(itertools.islice(rows, COLUMN_TYPE_SAMPLE_ROWS))
+        rows = itertools.chain(sample_rows, rows)
+    if limit is not None:
+        rows = itertools.islice(rows, limit)
+    column_formatters = _get_column_formatters(report_data.get("headers", []), report_data.get("column_types"), sample_rows)
+    return _time_formatting(_format_rows(column_formatters, rows))
+
+def _time_formatting(formatted_rows, limit=None):
+    """
+    Yields formatted rows, formatting FORMAT_CHUNK_ROWS at a time inside the "format" profiler phase,
+    so --profile separates formatting from writing. Streamed rows are fetched as they are formatted.
+    """
+    formatted_rows = iter(formatted_rows) if limit is None else itertools.islice(formatted_rows, limit)
+    while True:
+        with profiler.phase("format"):
+            chunk = list(itertools.islice(formatted_rows, FORMAT_CHUNK_ROWS))
+        if not chunk:
+            return
+        yield from chunk
+
+# Number of rows used to size console columns. Printing starts once they are formatted.
+CONSOLE_WIDTH_SAMPLE_ROWS = 200
+
+# Rows are written to HTML files in chunks of this many, so a large table is never held as one string.
+HTML_CHUNK_ROWS = 1000
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", "html-report-template.html")
+
+# Matches the template's {{ field }} placeholders and its table placeholder.
+TEMPLATE_PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}|<!-- REPORT_TABLE_PLACEHOLDER -->")
+
+_template_segments = None
+
+def _get_template_segments():
+    """
+    Returns the HTML template split into segments, reading and parsing it only once per process.
+    Each segment is ("text", literal), ("field", name) or ("table", None).
+    """
+    global _template_segments
+    if _template_segments is None:
+        with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+            template = f.read()
+        segments = []
+        position = 0
+        for match in TEMPLATE_PLACEHOLDER_PATTERN.finditer(template):
+            segments.append(("text", template[position:match.start()]))
+            segments.append(("field", match.group(1)) if match.group(1) else ("table", None))
+            position = match.end()
+        segments.append(("text", template[position:]))
+        _template_segments = segments
+    return _template_segments
+
+def _write_table_html(htmlfile, headers, rows):
+    """Writes an HTML table of escaped cells from already formatted rows, HTML_CHUNK_ROWS rows at a time."""
+    htmlfile.write('<table class="table table-striped table-bordered">\n<thead>\n<tr>')
+    htmlfile.write(''.join(f'<th>{html.escape(str(header))}</th>' for header in headers))
+    htmlfile.write('</tr>\n</thead>\n<tbody>\n')
+    chunk = []
+    for row in rows:
+        chunk.append(f'<tr>{"".join(f"<td>{html.escape(str(cell))}</td>" for cell in row)}</tr>\n')
+        if len(chunk) >= HTML_CHUNK_ROWS:
+            htmlfile.write(''.join(chunk))
+            chunk = []
+    htmlfile.write(''.join(chunk))
+    htmlfile.write('</tbody>\n</table>\n')
+
+# Renders the embedded rows one page at a time. Cells are set with textContent, so values are never parsed as HTML.
+PAGED_TABLE_SCRIPT = """<script>
+(function () {
+    var rows = JSON.parse(document.getElementById("report-rows").textContent);
+    var pageSize = %d, page = 0, pages = Math.max(1, Math.ceil(rows.length / pageSize));
+    var body = document.getElementById("report-body"), status = document.getElementById("report-page");
+    function render() {
+        var fragment = document.createDocumentFragment();
+        rows.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+            var tr = document.createElement("tr");
+            row.forEach(function (cell) {
+                var td = document.createElement("td");
+                td.textContent = cell;
+                tr.appendChild(td);
+            });
+            fragment.appendChild(tr);
+        });
+        body.replaceChildren(fragment);
+        status.textContent = "Page " + (page + 1) + " of " + pages + " (" + rows.length.toLocaleString() + " rows)";
+    }
+    document.getElementById("report-prev").onclick = function () { if (page > 0) { page--; render(); } };
+    document.getElementById("report-next").onclick = function () { if (page < pages - 1) { page++; render(); } };
+    render();
+})();
+</script>
+"""
+
+def _encode_rows_json(rows):
+    """Encodes rows as the comma-separated items of a compact JSON array, safe to embed in a script element."""
+    # "<" is escaped so a value can never close the script element
+    return json.dumps(rows, ensure_ascii=False, separators=(',', ':'))[1:-1].replace('<', '\\u003c')
+
+def _write_paged_table_html(htmlfile, headers, rows):
+    """
+    Writes the table header and pager, with the rows embedded as one compact JSON array
+    that the browser pages through. Rows are encoded HTML_CHUNK_ROWS at a time.
+    """
+    htmlfile.write('<div class="d-flex align-items-center mb-2">')
+    htmlfile.write('<button type="button" class="btn btn-outline-secondary btn-sm me-2" id="report-prev">Previous</button>')
+    htmlfile.write('<button type="button" class="btn btn-outline-secondary btn-sm me-3" id="report-next">Next</button>')
+    htmlfile.write('<span class="text-muted" id="report-page"></span></div>\n')
+    htmlfile.write('<table class="table table-striped table-bordered">\n<thead>\n<tr>')
+    htmlfile.write(''.join(f'<th>{html.escape(str(header))}</th>' for header in headers))
+    htmlfile.write('</tr>\n</thead>\n<tbody id="report-body"></tbody>\n</table>\n')
+
+    htmlfile.write('<script type="application/json" id="report-rows">[')
+    separator = ''
+    chunk = []
+    for row in rows:
+        chunk.append([str(cell) for cell in row])
+        if len(chunk) >= HTML_CHUNK_ROWS:
+            htmlfile.write(separator + _encode_rows_json(chunk))
+            separator = ','
+            chunk = []
+    if chunk:
+        htmlfile.write(separator + _encode_rows_json(chunk))
+    htmlfile.write(']</script>\n')
+    htmlfile.write(PAGED_TABLE_SCRIPT % HTML_PAGE_SIZE)
+
+def _open_pager():
+    """Starts the user's pager ($PAGER, otherwise less or more) to write to, or returns None if there isn't one."""
+    pager_command = os.environ.get("PAGER") or ("more" if sys.platform == "win32" else "less -FRSX")
+    if not pager_command.split() or not shutil.which(pager_command.split()[0]):
+        return None
+    try:
+        return subprocess.Popen(pager_command, shell=True, stdin=subprocess.PIPE, text=True, encoding="utf-8")
+    except OSError:
+        return None
+
+def print_to_console(report_data, selected_property_info=None, start_date=None, end_date=None, head=None, use_pager=True): # Match signature
+    """
+    Prints the report data in a formatted table to the console, starting as soon as the first rows are ready.
+    Column widths are sized from the headers and the first CONSOLE_WIDTH_SAMPLE_ROWS rows, so "rows" may be
+    an iterator (see --stream); a later, wider value just extends its line. head limits the number of rows
+    printed. Output longer than the terminal goes through a pager when use_pager is set and stdout is a terminal.
+    """
     if not report_data or not report_data.get("rows"):
         print("No data to display.")
         return
 
     headers = report_data.get("headers", [])
-    rows = report_data.get("rows", [])
     title = report_data.get("title", "Report")
     date_range_str = report_data.get("date_range", "")
+    total_rows = len(report_data["rows"]) if hasattr(report_data["rows"], "__len__") else None
 
-    # Format numbers for display
-    formatted_rows = []
-    for row in rows:
-        formatted_rows.append([_format_value(cell) for cell in row])
-
-    print(f"\n--- {title} ---")
-    if selected_property_info:
-        print(f"--- Property: {selected_property_info['display_name']} ({selected_property_info['property_id']}) ---")
-    if date_range_str:
-        print(f"--- Date Range: {date_range_str} ---")
-
+    # Format numbers for display, one precomputed formatter per column, and size the columns from a sample
+    rows = _iter_formatted_rows(report_data, limit=head)
+    formatted_sample = list(itertools.islice(rows, CONSOLE_WIDTH_SAMPLE_ROWS))
 
-    # Calculate column widths using formatted rows
     col_widths = [len(h) for h in headers]
-    for row in formatted_rows:
+    for row in formatted_sample:
         for i, cell in enumerate(row):
             if i < len(col_widths) and len(str(cell)) > col_widths[i]:
-                col_widths[i] = len(str(cell)) 
+                col_widths[i] = len(str(cell))
 
-    # Print headers
     header_line = " | ".join(headers[i].ljust(col_widths[i]) for i in range(len(headers)))
-    print(header_line)
-    print("-" * len(header_line))
 
-    # Print formatted rows
-    for row in formatted_rows:
-        row_line = " | ".join(str(row[i]).ljust(col_widths[i]) for i in range(len(row)))
-        print(row_line)
-    
-    print("-" * len(header_line))
+    pager = None
+    if use_pager and sys.stdout.isatty() and len(formatted_sample) + 6 > shutil.get_terminal_size().lines:
+        pager = _open_pager()
+    write_line = (lambda line: pager.stdin.write(line + "\n")) if pager else print
 
-def save_to_csv(report_data, selected_property_info, start_date, end_date):
-    """Saves the report data to a CSV file in a property-specific subdirectory within 'output'."""
-    if not report_data or not report_data.get("rows"):
-        print("No data to save.")
-        return
-    if not selected_property_info or not start_date or not end_date:
-        print("Error: Property information or date range missing for CSV output.")
-        return
+    try:
+        write_line(f"\n--- {title} ---")
+        if selected_property_info:
+            write_line(f"--- Property: {selected_property_info['display_name']} ({selected_property_info['property_id']}) ---")
+        if date_range_str:
+            write_line(f"--- Date Range: {date_range_str} ---")
 
-    headers = report_data.get("headers", [])
-    rows = report_data.get("rows", [])
+        # Print headers
+        write_line(header_line)
+        write_line("-" * len(header_line))
+
+        # Print formatted rows: the measured sample, then the rest as they are read
+        for row in itertools.chain(formatted_sample, rows):
+            write_line(" | ".join(str(cell).ljust(width) for cell, width in zip(row, col_widths)))
+
+        write_line("-" * len(header_line))
+        if head is not None and total_rows is not None and total_rows > head:
+            write_line(f"Showing the first {head:,} of {total_rows:,} rows.")
+    except BrokenPipeError:
+        pass # The pager was closed before all rows were shown
+    finally:
+        if pager:
+            try:
+                pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            pager.wait()
+
+def _get_output_filepath(report_data, selected_property_info, start_date, end_date, extension):
+    """Returns the property-specific output path for a report, creating the directory if needed."""
     report_title = report_data.get("title", "report")
-    
+
     # Sanitize names according to user preferences
     sanitized_property_name = _sanitize_name(selected_property_info['display_name'])
     sanitized_report_title = _sanitize_name(report_title)
@@ -109,8 +320,24 @@ def save_to_csv(report_data, selected_property_info, start_date, end_date):
     property_output_dir = os.path.join("output", sanitized_property_name)
     os.makedirs(property_output_dir, exist_ok=True) # Create if not exists
 
-    filename = f"{sanitized_report_title}-{start_date}-to-{end_date}.csv"
-    filepath = os.path.join(property_output_dir, filename)
+    filename = f"{sanitized_report_title}-{start_date}-to-{end_date}.{extension}"
+    return os.path.join(property_output_dir, filename)
+
+def save_to_csv(report_data, selected_property_info, start_date, end_date):
+    """
+    Saves the report data to a CSV file in a property-specific subdirectory within 'output'.
+    "rows" may be an iterator (see --stream), in which case rows are written as they arrive.
+    """
+    if not report_data or not report_data.get("rows"):
+        print("No data to save.")
+        return
+    if not selected_property_info or not start_date or not end_date:
+        print("Error: Property information or date range missing for CSV output.")
+        return
+
+    headers = report_data.get("headers", [])
+    rows = report_data.get("rows", [])
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "csv")
 
     try:
         with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
@@ -121,6 +348,74 @@ def save_to_csv(report_data, selected_property_info, start_date, end_date):
     except Exception as e:
         print(f"Error saving CSV file: {e}")
 
+def save_to_csv_gz(report_data, selected_property_info, start_date, end_date):
+    """
+    Saves the report data to a gzip-compressed CSV file (.csv.gz) in a property-specific subdirectory
+    within 'output'. Rows are compressed as they are written, so "rows" may be an iterator.
+    """
+    if not report_data or not report_data.get("rows"):
+        print("No data to save.")
+        return
+    if not selected_property_info or not start_date or not end_date:
+        print("Error: Property information or date range missing for compressed CSV output.")
+        return
+
+    headers = report_data.get("headers", [])
+    rows = report_data.get("rows", [])
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "csv.gz")
+
+    try:
+        with gzip.open(filepath, "wt", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        print(f"Successfully saved report to {filepath}")
+    except Exception as e:
+        print(f"Error saving compressed CSV file: {e}")
+
+def _write_jsonl_rows(jsonl_file, headers, rows):
+    """Writes one compact JSON object per row, keyed by header."""
+    for row in rows:
+        jsonl_file.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False))
+        jsonl_file.write("\n")
+
+def save_to_jsonl(report_data, selected_property_info, start_date, end_date):
+    """
+    Saves the report data as JSON Lines (one JSON object per row, keyed by header)
+    in a property-specific subdirectory within 'output'. "rows" may be an iterator.
+    """
+    if not report_data or not report_data.get("rows"):
+        print("No data to save.")
+        return
+    if not selected_property_info or not start_date or not end_date:
+        print("Error: Property information or date range missing for JSON Lines output.")
+        return
+
+    headers = report_data.get("headers", [])
+    rows = report_data.get("rows", [])
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "jsonl")
+
+    try:
+        with open(filepath, "w", encoding="utf-8") as jsonl_file:
+            _write_jsonl_rows(jsonl_file, headers, rows)
+        print(f"Successfully saved report to {filepath}")
+    except Exception as e:
+        print(f"Error saving JSON Lines file: {e}")
+
+def write_jsonl_to_stdout(report_data, selected_property_info=None, start_date=None, end_date=None): # Match signature
+    """
+    Writes the report data as JSON Lines to standard output, for piping into other tools.
+    run_report.py sends its status messages to stderr with this format, so stdout carries only rows.
+    """
+    if not report_data or not report_data.get("rows"):
+        print("No data to write.", file=sys.stderr)
+        return
+
+    try:
+        _write_jsonl_rows(sys.__stdout__, report_data.get("headers", []), report_data.get("rows", []))
+        sys.__stdout__.flush()
+    except BrokenPipeError:
+        pass # The reading process exited early (e.g. piped into head)
 
 def save_to_html(report_data, selected_property_info, start_date, end_date):
     """Saves the report data to an HTML file in a property-specific subdirectory within 'output'."""
@@ -134,43 +429,37 @@ def save_to_html(report_data, selected_property_info, start_date, end_date):
     headers = report_data.get("headers", [])
     rows = report_data.get("rows", [])
     report_title = report_data.get("title", "Report")
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "html")
 
-    # Sanitize names according to user preferences
-    sanitized_property_name = _sanitize_name(selected_property_info['display_name'])
-    sanitized_report_title = _sanitize_name(report_title)
-
-    # Create property-specific directory
-    property_output_dir = os.path.join("output", sanitized_property_name)
-    os.makedirs(property_output_dir, exist_ok=True) # Create if not exists
-
-    filename = f"{sanitized_report_title}-{start_date}-to-{end_date}.html"
-    filepath = os.path.join(property_output_dir, filename)
-
-    # Load HTML template
-    template_path = os.path.join(os.path.dirname(__file__), "templates", "html-report-template.html")
+    # The template is parsed once; fields are escaped and the table is written straight to the file
     try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
+        template_segments = _get_template_segments()
     except FileNotFoundError:
-        print(f"Error: HTML template not found at {template_path}")
+        print(f"Error: HTML template not found at {TEMPLATE_PATH}")
         return
     except Exception as e:
         print(f"Error loading HTML template: {e}")
         return
 
-    # Generate table HTML
-    table_html = _generate_table_html(headers, rows)
-
-    # Replace placeholders
-    date_range_str = report_data.get("date_range", f"{start_date} to {end_date}")
-    html_content = html_content.replace("{{ report_title }}", report_title)
-    html_content = html_content.replace("{{ property_display_name }}", selected_property_info['display_name'])
-    html_content = html_content.replace("{{ date_range }}", date_range_str)
-    html_content = html_content.replace("<!-- REPORT_TABLE_PLACEHOLDER -->", table_html)
+    fields = {
+        "report_title": report_title,
+        "property_display_name": selected_property_info['display_name'],
+        "date_range": report_data.get("date_range", f"{start_date} to {end_date}"),
+    }
+    # Large reports embed their rows as JSON and are paged in the browser; streamed rows have no length
+    paged = HTML_EMBED_JSON_MIN_ROWS is not None and hasattr(rows, "__len__") and len(rows) >= HTML_EMBED_JSON_MIN_ROWS
 
     try:
         with open(filepath, "w", encoding="utf-8") as htmlfile:
-            htmlfile.write(html_content)
+            for segment_type, segment in template_segments:
+                if segment_type == "text":
+                    htmlfile.write(segment)
+                elif segment_type == "field":
+                    htmlfile.write(html.escape(str(fields.get(segment, ""))))
+                elif paged:
+                    _write_paged_table_html(htmlfile, headers, _iter_formatted_rows(report_data))
+                else:
+                    _write_table_html(htmlfile, headers, _iter_formatted_rows(report_data))
         print(f"Successfully saved report to {filepath}")
     except Exception as e:
         print(f"Error saving HTML file: {e}")
@@ -179,3 +468,168 @@ def save_to_csv_and_html(report_data, selected_property_info, start_date, end_da
     """Saves the report data to both CSV and HTML files."""
     save_to_csv(report_data, selected_property_info, start_date, end_date)
     save_to_html(report_data, selected_property_info, start_date, end_date)
+
+def open_csv_for_append(report_data, selected_property_info, start_date, end_date):
+    """
+    Creates a report's CSV file with just its header row, for reports written a block of rows at a time
+    (see --run-all-properties-report). Returns (csv_file, csv_writer, filepath); the caller writes rows,
+    flushes after each block so finished blocks survive a crash, and closes the file.
+    """
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "csv")
+    csvfile = open(filepath, "w", newline="", encoding="utf-8")
+    writer = csv.writer(csvfile)
+    writer.writerow(report_data.get("headers", []))
+    csvfile.flush()
+    return csvfile, writer, filepath
+
+class CsvFileRows:
+    """The data rows of a CSV file, read again from disk each time they are iterated, so they are never all in memory."""
+
+    def __init__(self, filepath, row_count):
+        self.filepath = filepath
+        self.row_count = row_count
+
+    def __len__(self):
+        return self.row_count
+
+    def __iter__(self):
+        with open(self.filepath, newline="", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None) # Skip the header row
+            yield from reader
+
+def _iter_report_tables(report_data):
+    """
+    Yields report data as ReportTables: a table as it is, the pages of a streamed report that
+    provides them ("tables"), or other report data in chunks of EXPORT_CHUNK_ROWS rows converted
+    as they arrive, so streamed rows are never all held at once.
+    """
+    if isinstance(report_data, report_table.ReportTable):
+        yield report_data
+        return
+    if "tables" in report_data:
+        yield from report_data["tables"]
+        return
+
+    headers = report_data.get("headers", [])
+    column_types = report_data.get("column_types")
+    rows = iter(report_data.get("rows", []))
+    while True:
+        chunk = list(itertools.islice(rows, EXPORT_CHUNK_ROWS))
+        if not chunk:
+            return
+        if not column_types or None in column_types:
+            # Types missing from the report are inferred once, from the first chunk, so every chunk shares a schema
+            inferred_types = _infer_column_types(headers, chunk)
+            column_types = [inferred_type if not column_types or column_types[index] is None else column_types[index]
+                            for index, inferred_type in enumerate(inferred_types)]
+        yield report_table.ReportTable.from_rows(report_data.get("title", "Report"), headers, column_types, chunk)
+
+def _to_arrow_table(pa, table, keep_dictionaries=True):
+    """
+    Converts a ReportTable to a pyarrow Table without going through Python objects per cell:
+    numeric arrays are shared as buffers and dictionary-encoded columns stay dictionary-encoded
+    (or are expanded to plain strings when keep_dictionaries is False). Display formatters such
+    as percent are not applied, so formatted metrics keep their numeric type.
+    """
+    arrays = []
+    for column in table.columns:
+        if isinstance(column, report_table.DictionaryColumn):
+            codes = pa.Array.from_buffers(pa.uint32(), len(column.codes), [None, pa.py_buffer(column.codes)])
+            dictionary_array = pa.DictionaryArray.from_arrays(codes, pa.array(column.values, type=pa.string()))
+            arrays.append(dictionary_array if keep_dictionaries else dictionary_array.dictionary_decode())
+        else:
+            arrow_type = pa.int64() if column.typecode == report_table.INTEGER_TYPECODE else pa.float64()
+            arrays.append(pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)]))
+    return pa.Table.from_arrays(arrays, names=table.headers)
+
+def _arrow_schema(pa, report_data, keep_dictionaries=True):
+    """
+    Returns the pyarrow schema of a streamed report from its declared column types ("table_column_types"),
+    so every page is written with the same types, or None for other report data, whose first table sets it.
+    """
+    column_types = None if isinstance(report_data, report_table.ReportTable) else report_data.get("table_column_types")
+    if not column_types:
+        return None
+    string_type = pa.dictionary(pa.uint32(), pa.string()) if keep_dictionaries else pa.string()
+    arrow_types = {"integer": pa.int64(), "float": pa.float64(), "currency": pa.float64()}
+    return pa.schema([
+        (header, arrow_types.get(column_type, string_type)) for header, column_type in zip(report_data["headers"], column_types)
+    ])
+
+def save_to_parquet(report_data, selected_property_info, start_date, end_date):
+    """
+    Saves the report data as a Parquet file in a property-specific subdirectory within 'output'.
+    Metric columns keep their integer or float types; streamed rows are written in row groups as they arrive,
+    with the schema the report declares. Needs the optional pyarrow package.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Error: Parquet output needs the optional pyarrow package. Install it with: pip install pyarrow")
+        return
+    if not report_data or not report_data.get("rows"):
+        print("No data to save.")
+        return
+    if not selected_property_info or not start_date or not end_date:
+        print("Error: Property information or date range missing for Parquet output.")
+        return
+
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "parquet")
+    schema = _arrow_schema(pa, report_data)
+    writer = None
+    try:
+        for table in _iter_report_tables(report_data):
+            arrow_table = _to_arrow_table(pa, table)
+            if writer is None:
+                writer = pq.ParquetWriter(filepath, schema or arrow_table.schema)
+            writer.write_table(arrow_table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+            writer = None
+            print(f"Successfully saved report to {filepath}")
+    except Exception as e:
+        print(f"Error saving Parquet file: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
+
+def save_to_arrow(report_data, selected_property_info, start_date, end_date):
+    """
+    Saves the report data as an Arrow IPC file (.arrow) in a property-specific subdirectory within 'output'.
+    Needs the optional pyarrow package.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("Error: Arrow output needs the optional pyarrow package. Install it with: pip install pyarrow")
+        return
+    if not report_data or not report_data.get("rows"):
+        print("No data to save.")
+        return
+    if not selected_property_info or not start_date or not end_date:
+        print("Error: Property information or date range missing for Arrow output.")
+        return
+
+    filepath = _get_output_filepath(report_data, selected_property_info, start_date, end_date, "arrow")
+    # The IPC file format allows one dictionary per column, so chunked (streamed) reports write plain strings
+    keep_dictionaries = isinstance(report_data, report_table.ReportTable)
+    schema = _arrow_schema(pa, report_data, keep_dictionaries=keep_dictionaries)
+    writer = None
+    try:
+        for table in _iter_report_tables(report_data):
+            arrow_table = _to_arrow_table(pa, table, keep_dictionaries=keep_dictionaries)
+            if writer is None:
+                schema = schema or arrow_table.schema
+                writer = pa.ipc.new_file(filepath, schema)
+            writer.write_table(arrow_table.cast(schema))
+        if writer is not None:
+            writer.close()
+            writer = None
+            print(f"Successfully saved report to {filepath}")
+    except Exception as e:
+        print(f"Error saving Arrow file: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
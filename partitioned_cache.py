@@ -0,0 +1,252 @@
+import cache_store
+import profiler
+import report_engine
+from datetime import datetime, timedelta
+
+from settings import REPORT_PAGE_SIZE # Import settings from settings.py
+
+# Metrics that can be summed across days to give the value for the whole range.
+# User counts such as totalUsers and activeUsers are not additive (one user can
+# visit on many days) and ratios such as engagementRate can't be summed either,
+# so reports using them are always fetched for the whole range.
+ADDITIVE_METRICS = {
+    "screenPageViews",
+    "sessions",
+    "engagedSessions",
+    "newUsers",
+    "eventCount",
+    "conversions",
+    "keyEvents",
+    "userEngagementDuration",
+    "transactions",
+    "ecommercePurchases",
+    "purchaseRevenue",
+    "totalRevenue",
+}
+
+def is_day_partitionable(spec):
+    """
+    Returns True if a spec's report can be assembled from per-day cached results.
+    All metrics must be additive. Reports with a row limit (top N) need every row of
+    every day to rank locally, so they only qualify when they opt in with
+    "partition_by_day": True; any spec can opt out with "partition_by_day": False.
+    """
+    if not all(metric in ADDITIVE_METRICS for metric in spec["metrics"]):
+        return False
+    return spec.get("partition_by_day", not spec.get("limit"))
+
+def run_day_partitioned(spec, property_id, start_date, end_date, get_data_client, no_cache=False):
+    """
+    Returns the raw report for a spec over a date range, built from per-day cache entries.
+    Only the days missing from the cache are fetched, in one request spanning them, and
+    the requested range is rebuilt locally. get_data_client is only called if a fetch is needed.
+    Returns None if the fetch fails.
+    """
+    days = _days_in_range(start_date, end_date)
+    store = cache_store.get_cache_store()
+
+    day_reports = {}
+    if not no_cache:
+        with profiler.phase("cache_read"):
+            for day in days:
+                day_report = store.get(_day_cache_key(spec, property_id, day))
+                if day_report is not None:
+                    day_reports[day] = day_report
+
+    missing_days = [day for day in days if day not in day_reports]
+    if missing_days:
+        print(f"{len(days) - len(missing_days)} of {len(days)} days cached; fetching {missing_days[0]} to {missing_days[-1]}.")
+        data_client = get_data_client()
+        if not data_client:
+            return None
+        fetched_day_reports = _fetch_days(spec, property_id, missing_days[0], missing_days[-1], data_client)
+        if fetched_day_reports is None:
+            return None
+
+        with profiler.phase("cache_write"):
+            for day, day_report in fetched_day_reports.items():
+                day_reports[day] = day_report
+                # Recent days are still being processed by GA4, so they expire sooner than settled days
+                store.set(_day_cache_key(spec, property_id, day), day_report, ttl=cache_store.ttl_for_end_date(day))
+    else:
+        print(f"All {len(days)} days loaded from the daily cache.")
+
+    return _combine_days(spec, [day_reports[day] for day in days])
+
+def run_month_partitioned(spec, property_id, months, get_data_client, no_cache=False):
+    """
+    Returns a dict of month ('YYYY-MM') -> raw month report for a spec, using the yearMonth dimension.
+    Months missing from the cache are fetched together in one paged request. Months that are
+    closed (ended more than GA4_PROCESSING_LAG_DAYS ago) can't change, so they are kept for
+    CACHE_TTL_CLOSED and later runs only fetch newly closed months. Returns None if the fetch fails.
+    """
+    store = cache_store.get_cache_store()
+
+    month_reports = {}
+    if not no_cache:
+        with profiler.phase("cache_read"):
+            for month in months:
+                month_report = store.get(_month_cache_key(spec, property_id, month))
+                if month_report is not None:
+                    month_reports[month] = month_report
+
+    missing_months = [month for month in months if month not in month_reports]
+    if not missing_months:
+        print(f"All {len(months)} months loaded from the monthly cache.")
+        return month_reports
+
+    print(f"{len(months) - len(missing_months)} of {len(months)} months cached; fetching {missing_months[0]} to {missing_months[-1]}.")
+    data_client = get_data_client()
+    if not data_client:
+        return None
+
+    start_date = f"{missing_months[0]}-01"
+    end_date = _last_day_of_month(missing_months[-1]).strftime('%Y-%m-%d')
+    dimensions = _partition_dimensions(spec, "yearMonth")
+    raw_report = _fetch_all_rows(spec, property_id, dimensions, start_date, end_date, data_client)
+    if raw_report is None:
+        return None
+
+    month_index = dimensions.index("yearMonth")
+    # Rows are stored in the spec's own column order, so an added yearMonth column is dropped
+    keep_month_column = "yearMonth" in spec.get("dimensions", [])
+    fetched_months = {month: {"metric_types": raw_report["metric_types"], "rows": []} for month in missing_months}
+    for row in raw_report["rows"]:
+        api_month = row[month_index]
+        month = f"{api_month[:4]}-{api_month[4:]}"
+        if month in fetched_months:
+            fetched_months[month]["rows"].append(row if keep_month_column else row[:month_index] + row[month_index + 1:])
+
+    with profiler.phase("cache_write"):
+        for month, month_report in fetched_months.items():
+            month_reports[month] = month_report
+            month_ttl = cache_store.ttl_for_end_date(_last_day_of_month(month).strftime('%Y-%m-%d'))
+            store.set(_month_cache_key(spec, property_id, month), month_report, ttl=month_ttl)
+    return month_reports
+
+def _month_cache_key(spec, property_id, month):
+    """Returns the cache key for one property, one calendar month and the spec's dimensions and metrics."""
+    return report_engine.request_fingerprint({
+        "partition": "month",
+        "property": f"properties/{property_id}",
+        "dimensions": _partition_dimensions(spec, "yearMonth"),
+        "metrics": list(spec["metrics"]),
+        "month": month,
+    })
+
+def _last_day_of_month(month):
+    """Returns the last date of a 'YYYY-MM' month."""
+    first_day = datetime.strptime(f"{month}-01", '%Y-%m-%d').date()
+    first_day_of_next_month = (first_day + timedelta(days=32)).replace(day=1)
+    return first_day_of_next_month - timedelta(days=1)
+
+def _days_in_range(start_date, end_date):
+    """Returns every date from start_date to end_date inclusive, as YYYY-MM-DD strings."""
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((end - start).days + 1)]
+
+def _day_cache_key(spec, property_id, day):
+    """Returns the cache key for one property, one day and the spec's dimensions and metrics."""
+    return report_engine.request_fingerprint({
+        "partition": "day",
+        "property": f"properties/{property_id}",
+        "dimensions": _partition_dimensions(spec, "date"),
+        "metrics": list(spec["metrics"]),
+        "date": day,
+    })
+
+def _partition_dimensions(spec, partition_dimension):
+    """Returns the spec's dimensions with the partition dimension added, so rows can be split by it."""
+    dimensions = list(spec.get("dimensions", []))
+    if partition_dimension not in dimensions:
+        dimensions.append(partition_dimension)
+    return dimensions
+
+def _fetch_all_rows(spec, property_id, dimensions, start_date, end_date, data_client):
+    """Fetches every row of the given dimensions and the spec's metrics in one paged request, or None on error."""
+    request = report_engine.request_from_fields({
+        "property": f"properties/{property_id}",
+        "dimensions": [{"name": dimension} for dimension in dimensions],
+        "metrics": [{"name": metric} for metric in spec["metrics"]],
+        "date_ranges": [{"start_date": start_date, "end_date": end_date}],
+        "limit": REPORT_PAGE_SIZE,
+    })
+
+    try:
+        response = data_client.run_report(request)
+        raw_report = report_engine.extract_response(response)
+        for page_response in report_engine.iter_following_pages(data_client, request, response):
+            raw_report["rows"].extend(report_engine.extract_response(page_response)["rows"])
+    except Exception as e:
+        print(f"Error running {spec['title']}: {e}")
+        return None
+    return raw_report
+
+def _fetch_days(spec, property_id, start_date, end_date, data_client):
+    """
+    Fetches every row of the spec's dimensions by day for a date range, in one paged request.
+    Returns a dict of day -> raw day report ({metric_types, rows}), including empty days.
+    """
+    dimensions = _partition_dimensions(spec, "date")
+    date_index = dimensions.index("date")
+    raw_report = _fetch_all_rows(spec, property_id, dimensions, start_date, end_date, data_client)
+    if raw_report is None:
+        return None
+
+    day_reports = {
+        day: {"metric_types": raw_report["metric_types"], "rows": []}
+        for day in _days_in_range(start_date, end_date)
+    }
+    for row in raw_report["rows"]:
+        api_date = row[date_index]
+        day = f"{api_date[:4]}-{api_date[4:6]}-{api_date[6:]}"
+        if day in day_reports:
+            day_reports[day]["rows"].append(row)
+    return day_reports
+
+def _combine_days(spec, day_reports):
+    """Sums per-day rows into one raw report for the spec, then applies its ordering and limit."""
+    dimensions = list(spec.get("dimensions", []))
+    metrics = list(spec["metrics"])
+    partition_dimensions = _partition_dimensions(spec, "date")
+    # Positions of the spec's own dimensions within the per-day rows
+    dimension_indexes = [partition_dimensions.index(dimension) for dimension in dimensions]
+    metric_offset = len(partition_dimensions)
+    metric_types = next((day_report["metric_types"] for day_report in day_reports if day_report["metric_types"]), [])
+    is_integer = [metric_type == "TYPE_INTEGER" for metric_type in metric_types] or [True] * len(metrics)
+
+    totals = {}
+    for day_report in day_reports:
+        for row in day_report["rows"]:
+            key = tuple(row[index] for index in dimension_indexes)
+            values = totals.get(key)
+            if values is None:
+                values = totals[key] = [0] * len(metrics)
+            for i in range(len(metrics)):
+                value = row[metric_offset + i]
+                values[i] += int(value) if is_integer[i] else float(value)
+
+    rows = [list(key) + [str(value) for value in values] for key, values in totals.items()]
+
+    # Apply the spec's order_bys locally; sorting by the last key first keeps earlier keys dominant
+    columns = dimensions + metrics
+    for order_by in reversed(spec.get("order_bys", [])):
+        if "metric" in order_by:
+            index = columns.index(order_by["metric"])
+            rows.sort(key=lambda row: float(row[index]), reverse=order_by.get("desc", False))
+        else:
+            index = columns.index(order_by["dimension"])
+            rows.sort(key=lambda row: row[index], reverse=order_by.get("desc", False))
+
+    row_count = len(rows)
+    if spec.get("limit"):
+        rows = rows[:spec["limit"]]
+
+    return {
+        "dimension_headers": dimensions,
+        "metric_headers": metrics,
+        "metric_types": metric_types,
+        "rows": rows,
+        "row_count": row_count,
+    }
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Lightweight run instrumentation. The rest of the code records into it unconditionally:
+#
+#   with profiler.phase("api"): ...     -> wall time and call count per phase
+#   profiler.record_api_call(seconds)   -> one Data API round trip, for latency percentiles
+#   profiler.count("cache_hits")        -> named counters (cache hits/misses/stale, rows)
+#
+# Recording is a perf_counter call and a dict update, so it stays on for every run; only
+# memory tracing (tracemalloc, which slows allocation-heavy code) waits for start(trace_memory=True).
+# Phases can nest: a streamed report's API calls happen while its output is being written,
+# so "output" then includes them.
+
+# Prefix of every metric in the Prometheus textfile.
+PROMETHEUS_PREFIX = "ga4_reporter"
+
+# Counters every metrics file reports, even when they stay at zero.
+COUNTERS = ("cache_hits", "cache_misses", "cache_stale", "rows")
+
+_lock = threading.Lock()
+_started_at = time.perf_counter()
+_phases = {} # phase name -> {"seconds": total wall time, "calls": count}
+_api_latencies = []
+_counters = dict.fromkeys(COUNTERS, 0)
+
+def start(trace_memory=False):
+    """Resets all measurements and starts the run clock, and tracemalloc if trace_memory is True."""
+    global _started_at
+    with _lock:
+        _started_at = time.perf_counter()
+        _phases.clear()
+        _api_latencies.clear()
+        _counters.clear()
+        _counters.update(dict.fromkeys(COUNTERS, 0))
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+@contextmanager
+def phase(name):
+    """Adds the wall time of the enclosed block to the named phase."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            totals = _phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            totals["seconds"] += elapsed
+            totals["calls"] += 1
+
+def record_api_call(seconds):
+    """Records the latency of one Data API call."""
+    with _lock:
+        _api_latencies.append(seconds)
+
+def count(name, amount=1):
+    """Adds amount to a named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def _percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of sorted values, or None if there are none."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100)) # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+def get_metrics():
+    """Returns everything measured so far as a JSON-serialisable dictionary."""
+    with _lock:
+        run_seconds = time.perf_counter() - _started_at
+        phases = {name: dict(totals) for name, totals in sorted(_phases.items())}
+        latencies = sorted(_api_latencies)
+        counters = dict(_counters)
+
+    cache_lookups = counters["cache_hits"] + counters["cache_misses"] + counters["cache_stale"]
+    metrics = {
+        "timestamp": time.time(),
+        "run_seconds": run_seconds,
+        "phases": phases,
+        "api_calls": {
+            "count": len(latencies),
+            "total_seconds": sum(latencies),
+            "p50_seconds": _percentile(latencies, 50),
+            "p90_seconds": _percentile(latencies, 90),
+            "p99_seconds": _percentile(latencies, 99),
+            "max_seconds": latencies[-1] if latencies else None,
+        },
+        "rows": counters["rows"],
+        "rows_per_second": counters["rows"] / run_seconds if run_seconds else 0.0,
+        "cache": {
+            "hits": counters["cache_hits"],
+            "misses": counters["cache_misses"],
+            "stale": counters["cache_stale"],
+            "hit_rate": counters["cache_hits"] / cache_lookups if cache_lookups else None,
+        },
+        "peak_memory_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+    }
+    metrics["counters"] = {name: value for name, value in counters.items() if name not in COUNTERS}
+    return metrics
+
+def _format_seconds(seconds):
+    """Formats a duration for the summary, in ms below one second."""
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:.1f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+def print_summary():
+    """Prints the run's measurements as a short table."""
+    metrics = get_metrics()
+    print("\n--- Profile ---")
+    print(f"Total run time: {_format_seconds(metrics['run_seconds'])}")
+    for name, totals in sorted(metrics["phases"].items(), key=lambda item: item[1]["seconds"], reverse=True):
+        print(f"  {name:<16} {_format_seconds(totals['seconds']):>10}  ({totals['calls']} call{'s' if totals['calls'] != 1 else ''})")
+
+    api_calls = metrics["api_calls"]
+    if api_calls["count"]:
+        print(f"API calls: {api_calls['count']}, latency p50 {_format_seconds(api_calls['p50_seconds'])}, "
+              f"p90 {_format_seconds(api_calls['p90_seconds'])}, p99 {_format_seconds(api_calls['p99_seconds'])}, "
+              f"max {_format_seconds(api_calls['max_seconds'])}")
+    print(f"Rows from the API: {metrics['rows']:,} ({metrics['rows_per_second']:,.0f} rows/s over the run)")
+
+    cache = metrics["cache"]
+    hit_rate = f", {cache['hit_rate']:.0%} hit rate" if cache["hit_rate"] is not None else ""
+    print(f"Cache: {cache['hits']} hit(s), {cache['misses']} miss(es), {cache['stale']} stale{hit_rate}")
+    for name, value in metrics["counters"].items():
+        print(f"{name}: {value}")
+    if metrics["peak_memory_bytes"] is not None:
+        print(f"Peak traced memory: {metrics['peak_memory_bytes'] / (1024 * 1024):.1f} MB")
+
+def _prometheus_lines(metrics):
+    """Returns the metrics in the Prometheus text exposition format, one line per sample."""
+    lines = []
+
+    def gauge(name, help_text, samples):
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            label_text = "{" + ",".join(f'{key}="{label}"' for key, label in labels.items()) + "}" if labels else ""
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{label_text} {value}")
+
+    api_calls = metrics["api_calls"]
+    cache = metrics["cache"]
+    gauge("last_run_timestamp_seconds", "Unix time the last run finished.", [({}, metrics["timestamp"])])
+    gauge("run_seconds", "Wall time of the last run.", [({}, metrics["run_seconds"])])
+    gauge("phase_seconds", "Wall time spent in each phase of the last run.",
+          [({"phase": name}, totals["seconds"]) for name, totals in metrics["phases"].items()])
+    gauge("phase_calls", "Times each phase ran in the last run.",
+          [({"phase": name}, totals["calls"]) for name, totals in metrics["phases"].items()])
+    gauge("api_calls", "Data API calls made in the last run.", [({}, api_calls["count"])])
+    gauge("api_latency_seconds", "Data API call latency percentiles in the last run.",
+          [({"quantile": quantile}, api_calls[key]) for quantile, key in (("0.5", "p50_seconds"), ("0.9", "p90_seconds"), ("0.99", "p99_seconds"), ("1", "max_seconds"))])
+    gauge("rows", "Rows received from the Data API in the last run.", [({}, metrics["rows"])])
+    gauge("rows_per_second", "Rows received from the Data API per second of the last run.", [({}, metrics["rows_per_second"])])
+    gauge("cache_lookups", "Report cache lookups in the last run, by result.",
+          [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"]), ({"result": "stale"}, cache["stale"])])
+    gauge("peak_memory_bytes", "Peak memory traced by tracemalloc in the last run.", [({}, metrics["peak_memory_bytes"])])
+    for name, value in metrics["counters"].items():
+        gauge(name, f"The {name} counter in the last run.", [({}, value)])
+    return lines
+
+def write_metrics_file(filepath):
+    """
+    Writes the run's measurements to filepath: a Prometheus textfile if it ends in .prom, otherwise JSON.
+    The file is replaced atomically, so a collector never reads a partial file.
+    """
+    metrics = get_metrics()
+    temp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as metrics_file:
+            if filepath.endswith(".prom"):
+                metrics_file.write("\n".join(_prometheus_lines(metrics)) + "\n")
+            else:
+                json.dump(metrics, metrics_file, indent=2)
+        os.replace(temp_path, filepath)
+        print(f"Metrics written to {filepath}")
+    except Exception as e:
+        print(f"Error writing metrics file: {e}")
@@ -0,0 +1,175 @@
+import ga4_client
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from settings import PROPERTY_CACHE_DURATION, PROPERTY_ENUMERATION_METHOD, PROPERTY_ENUMERATION_WORKERS # Import settings from settings.py
+
+# Largest page size the Admin API accepts for list calls, to keep the number of pages down.
+ADMIN_PAGE_SIZE = 200
+
+ENUMERATION_METHODS = ("summaries", "parallel", "sequential")
+
+# The catalogue lives in its own subdirectory so the report cache cleanup,
+# which only sweeps files directly inside 'cache', never removes it.
+CATALOGUE_PATH = os.path.join("cache", "properties", "catalogue.json")
+
+# In-memory copy of the catalogue, so returning to property selection is instant.
+_catalogue_lock = threading.Lock()
+_catalogue = None
+
+def get_catalogue(refresh=False):
+    """
+    Returns the catalogue of accessible accounts and their properties.
+    Served from memory, then from disk while younger than PROPERTY_CACHE_DURATION,
+    and only fetched from the Admin API when missing, stale or refresh is requested.
+    """
+    global _catalogue
+    with _catalogue_lock:
+        if not refresh:
+            if _catalogue is not None:
+                return _catalogue
+            catalogue = _load_catalogue()
+            if catalogue is not None:
+                _catalogue = catalogue
+                return _catalogue
+
+        catalogue = _fetch_catalogue()
+        if catalogue is None:
+            return None
+        _save_catalogue(catalogue)
+        _catalogue = catalogue
+        return _catalogue
+
+def get_all_properties(refresh=False):
+    """Returns every property in the catalogue as a flat list of {display_name, property_id} dicts."""
+    catalogue = get_catalogue(refresh=refresh)
+    if not catalogue:
+        return []
+    return [prop for account in catalogue["accounts"] for prop in account["properties"]]
+
+def find_property(property_id, refresh=False):
+    """Looks up a property by ID in the catalogue, returning None if it is not listed."""
+    property_id = str(property_id)
+    for prop in get_all_properties(refresh=refresh):
+        if prop["property_id"] == property_id:
+            return prop
+    return None
+
+def _load_catalogue():
+    """Loads the catalogue from disk if it exists and is younger than PROPERTY_CACHE_DURATION."""
+    if not os.path.exists(CATALOGUE_PATH):
+        return None
+    try:
+        with open(CATALOGUE_PATH, 'r', encoding='utf-8') as f:
+            catalogue = json.load(f)
+    except Exception as e:
+        print(f"Error loading property catalogue: {e}. Fetching a fresh copy.")
+        return None
+
+    if (time.time() - catalogue.get("fetched_at", 0)) >= PROPERTY_CACHE_DURATION:
+        return None
+    print(f"Loaded {sum(len(a['properties']) for a in catalogue['accounts'])} properties from catalogue: {CATALOGUE_PATH}")
+    return catalogue
+
+def _save_catalogue(catalogue):
+    """Writes the catalogue to disk via a temporary file so readers never see a partial file."""
+    try:
+        os.makedirs(os.path.dirname(CATALOGUE_PATH), exist_ok=True)
+        temp_path = f"{CATALOGUE_PATH}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(catalogue, f)
+        os.replace(temp_path, CATALOGUE_PATH)
+    except Exception as e:
+        print(f"Error saving property catalogue: {e}")
+
+def fetch_accounts_and_properties(admin_client, method=PROPERTY_ENUMERATION_METHOD, workers=PROPERTY_ENUMERATION_WORKERS):
+    """
+    Enumerates all accessible accounts and their properties, sorted by display name.
+    Returns a list of {name, display_name, properties: [{display_name, property_id}]} dicts.
+
+    method selects how the Admin API is walked:
+      "summaries"  - one paged ListAccountSummaries call covering every account and property.
+      "parallel"   - ListAccounts, then each account's ListProperties paged concurrently.
+      "sequential" - ListAccounts, then one ListProperties per account in turn (the original N+1 path).
+    """
+    # Imported here so loading the catalogue from disk doesn't pull in the Admin client library
+    from google.analytics.admin_v1alpha.types import ListAccountsRequest
+
+    if method == "summaries":
+        accounts = _enumerate_with_account_summaries(admin_client)
+    elif method in ("parallel", "sequential"):
+        all_accounts = list(admin_client.list_accounts(request=ListAccountsRequest(page_size=ADMIN_PAGE_SIZE)))
+        list_account_properties = lambda account: _list_account_properties(admin_client, account)
+        if method == "parallel" and len(all_accounts) > 1:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                properties_by_account = list(executor.map(list_account_properties, all_accounts))
+        else:
+            properties_by_account = [list_account_properties(account) for account in all_accounts]
+
+        accounts = [
+            {
+                "name": account.name,
+                "display_name": account.display_name,
+                "properties": properties
+            }
+            for account, properties in zip(all_accounts, properties_by_account)
+        ]
+    else:
+        raise ValueError(f"Unknown property enumeration method '{method}'. Choose from: {', '.join(ENUMERATION_METHODS)}.")
+
+    accounts.sort(key=lambda account: account["display_name"])
+    for account in accounts:
+        account["properties"].sort(key=lambda prop: prop["display_name"])
+    return accounts
+
+def _enumerate_with_account_summaries(admin_client):
+    """Lists every account and property through the account summaries listing."""
+    from google.analytics.admin_v1alpha.types import ListAccountSummariesRequest
+    request = ListAccountSummariesRequest(page_size=ADMIN_PAGE_SIZE)
+    return [
+        {
+            "name": summary.account,
+            "display_name": summary.display_name,
+            "properties": [
+                {
+                    "display_name": prop.display_name,
+                    "property_id": prop.property.split('/')[-1]
+                }
+                for prop in summary.property_summaries
+            ]
+        }
+        for summary in admin_client.list_account_summaries(request=request)
+    ]
+
+def _list_account_properties(admin_client, account):
+    """Pages through the properties of a single account."""
+    from google.analytics.admin_v1alpha.types import ListPropertiesRequest
+    request = ListPropertiesRequest(filter=f"ancestor:{account.name}", page_size=ADMIN_PAGE_SIZE)
+    return [
+        {
+            "display_name": prop.display_name,
+            "property_id": prop.name.split('/')[-1]
+        }
+        for prop in admin_client.list_properties(request=request)
+    ]
+
+def _fetch_catalogue():
+    """Fetches all accounts and their properties from the Admin API."""
+    admin_client = ga4_client.get_admin_client()
+    if not admin_client:
+        return None
+
+    print("Fetching accounts and properties from the Admin API...")
+    try:
+        accounts = fetch_accounts_and_properties(admin_client)
+    except Exception as e:
+        print(f"Error fetching accounts and properties: {e}")
+        return None
+
+    return {
+        "fetched_at": time.time(),
+        "accounts": accounts
+    }
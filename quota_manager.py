@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+
+import profiler
+
+from settings import API_MAX_ATTEMPTS, API_BACKOFF_BASE_SECONDS, API_BACKOFF_MAX_SECONDS, PROPERTY_MAX_CONCURRENT_REQUESTS, PROJECT_MAX_CONCURRENT_REQUESTS # Import settings from settings.py
+
+# Every Data API call goes through this module (ga4_client wraps the pooled data client in a
+# QuotaAwareDataClient). Requests ask GA4 to return the property's quota with each response;
+# the remaining tokens are tracked per property, and this project's share of the hourly
+# tokens once for the whole project. They cap how many requests each property, and the project
+# across all properties, may have in flight, so concurrent runs slow down before they hit a limit. Retryable errors are retried with
+# jittered exponential backoff instead of failing the report.
+
+# Token quotas reported in PropertyQuota that a request spends from, tracked per property.
+TOKEN_QUOTAS = ("tokens_per_day", "tokens_per_hour")
+# This project's share of the hourly tokens, tracked once for every property the project reports on.
+PROJECT_TOKEN_QUOTA = "tokens_per_project_per_hour"
+
+# google.api_core exception classes worth retrying: the request can succeed once quota refills or the service recovers.
+# Matched by name so this module never has to import the client library.
+RETRYABLE_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError"}
+QUOTA_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+
+_condition = threading.Condition()
+_properties = {} # property resource name -> throttling state, see _get_property_state
+_project = {
+    "limit": PROJECT_MAX_CONCURRENT_REQUESTS, # requests allowed in flight across all properties
+    "in_flight": 0,
+    "remaining": None, # project tokens left after the last response that reported them
+    "tokens_per_request": 1, # project tokens the last request cost
+}
+_stats = {
+    "requests": 0,
+    "retries": 0,
+    "throttled_waits": 0,
+    "quota_errors": 0,
+}
+
+class QuotaAwareDataClient:
+    """Wraps a Data API client so its report calls are throttled and retried; other attributes pass straight through."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def run_report(self, request=None, **kwargs):
+        return execute(self._client.run_report, request, **kwargs)
+
+    def batch_run_reports(self, request=None, **kwargs):
+        return execute(self._client.batch_run_reports, request, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def execute(call, request, **kwargs):
+    """
+    Sends a RunReportRequest or BatchRunReportsRequest with call, asking for the property quota.
+    Waits while the property already has as many requests in flight as its quota allows, and
+    retries retryable errors up to API_MAX_ATTEMPTS times with jittered exponential backoff.
+    """
+    _request_property_quota(request)
+    property_name = request.property
+    for attempt in range(1, API_MAX_ATTEMPTS + 1):
+        _acquire(property_name)
+        started = time.perf_counter()
+        try:
+            with profiler.phase("api"):
+                response = call(request, **kwargs)
+        except Exception as e:
+            profiler.record_api_call(time.perf_counter() - started)
+            error_names = {error_class.__name__ for error_class in type(e).__mro__}
+            is_quota_error = bool(error_names & QUOTA_ERRORS)
+            daily_quota_spent = _release(property_name, quota_error=is_quota_error)
+            if attempt == API_MAX_ATTEMPTS or not error_names & RETRYABLE_ERRORS or (is_quota_error and daily_quota_spent):
+                raise
+            # Full jitter keeps properties that failed together from retrying together
+            delay = random.uniform(0, min(API_BACKOFF_MAX_SECONDS, API_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+            with _condition:
+                _stats["retries"] += 1
+            print(f"{type(e).__name__} from the Data API for {property_name}; retrying in {delay:.1f}s (attempt {attempt + 1} of {API_MAX_ATTEMPTS}).")
+            with profiler.phase("retry_backoff"):
+                time.sleep(delay)
+            continue
+        profiler.record_api_call(time.perf_counter() - started)
+        _release(property_name, property_quota=_lowest_property_quota(response))
+        return response
+
+def get_quota_stats():
+    """Returns the request, retry, throttling and quota error counters, plus the project's and each property's limit and remaining tokens."""
+    with _condition:
+        stats = dict(_stats)
+        stats["project"] = {"limit": _project["limit"], "remaining": _project["remaining"]}
+        stats["properties"] = {
+            property_name: {"limit": state["limit"], "remaining": dict(state["remaining"])}
+            for property_name, state in _properties.items()
+        }
+        return stats
+
+def _request_property_quota(request):
+    """Sets return_property_quota on a request, or on every request of a batch. The cache fingerprint doesn't include it."""
+    inner_requests = getattr(request, "requests", None)
+    for inner_request in (inner_requests if inner_requests is not None else [request]):
+        inner_request.return_property_quota = True
+
+def _lowest_property_quota(response):
+    """Returns the PropertyQuota with the fewest hourly tokens left among a response's reports, or None if none was returned."""
+    reports = getattr(response, "reports", None)
+    quotas = [report.property_quota for report in (reports if reports is not None else [response]) if "property_quota" in report]
+    return min(quotas, key=lambda quota: quota.tokens_per_hour.remaining, default=None)
+
+def _get_property_state(property_name):
+    """Returns the throttling state for a property, creating it on first use. Call with _condition held."""
+    state = _properties.get(property_name)
+    if state is None:
+        state = _properties[property_name] = {
+            "limit": PROPERTY_MAX_CONCURRENT_REQUESTS, # requests allowed in flight
+            "in_flight": 0,
+            "remaining": {}, # token quota name -> tokens left after the last response
+            "tokens_per_request": 1, # hourly tokens the last request cost
+        }
+    return state
+
+def _acquire(property_name):
+    """Blocks until both the property and the project have room for another request in flight, then takes it."""
+    with _condition:
+        state = _get_property_state(property_name)
+        _stats["requests"] += 1
+        is_full = lambda: state["in_flight"] >= state["limit"] or _project["in_flight"] >= _project["limit"]
+        if is_full():
+            _stats["throttled_waits"] += 1
+        while is_full():
+            _condition.wait()
+        state["in_flight"] += 1
+        _project["in_flight"] += 1
+
+def _release(property_name, property_quota=None, quota_error=False):
+    """
+    Gives back a request's slot and adapts the property's and the project's limits: halved after a
+    quota error, otherwise raised by one up to the number of requests the remaining tokens can pay for.
+    Returns True if the property's daily tokens are known to be spent.
+    """
+    with _condition:
+        state = _get_property_state(property_name)
+        state["in_flight"] -= 1
+        _project["in_flight"] -= 1
+        if quota_error:
+            _stats["quota_errors"] += 1
+            state["limit"] = max(1, state["limit"] // 2)
+            _project["limit"] = max(1, _project["limit"] // 2)
+        elif property_quota is not None:
+            for quota_name in TOKEN_QUOTAS:
+                if quota_name in property_quota:
+                    state["remaining"][quota_name] = getattr(property_quota, quota_name).remaining
+            state["tokens_per_request"] = max(1, property_quota.tokens_per_hour.consumed)
+            affordable_requests = min(state["remaining"].values(), default=PROPERTY_MAX_CONCURRENT_REQUESTS) // state["tokens_per_request"]
+            state["limit"] = max(1, min(state["limit"] + 1, affordable_requests, PROPERTY_MAX_CONCURRENT_REQUESTS))
+            if PROJECT_TOKEN_QUOTA in property_quota:
+                project_quota = getattr(property_quota, PROJECT_TOKEN_QUOTA)
+                _project["remaining"] = project_quota.remaining
+                _project["tokens_per_request"] = max(1, project_quota.consumed)
+            _raise_project_limit()
+        else:
+            state["limit"] = min(state["limit"] + 1, PROPERTY_MAX_CONCURRENT_REQUESTS)
+            _raise_project_limit()
+        _condition.notify_all()
+        return state["remaining"].get("tokens_per_day", state["tokens_per_request"]) < state["tokens_per_request"]
+
+def _raise_project_limit():
+    """Raises the project's limit by one, up to the requests its remaining tokens can pay for. Call with _condition held."""
+    affordable_requests = PROJECT_MAX_CONCURRENT_REQUESTS
+    if _project["remaining"] is not None:
+        affordable_requests = _project["remaining"] // _project["tokens_per_request"]
+    _project["limit"] = max(1, min(_project["limit"] + 1, affordable_requests, PROJECT_MAX_CONCURRENT_REQUESTS))
@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+
+import report_table
+import run_report
+
+from settings import SERVE_HOST, SERVE_PORT, SERVE_CLIENT_TIMEOUT_SECONDS # Import settings from settings.py
+
+# Submits a report to a server started with `py run_report.py --serve` and writes the result
+# with the same output functions as run_report.py. The server already holds the API clients,
+# the property catalogue and recent reports, so this script never loads the Google libraries
+# or credentials itself.
+
+def request_reports(server_url, params):
+    """Posts a report request to the server and returns its decoded response, or None after printing the error."""
+    request = urllib.request.Request(
+        f"{server_url}/report",
+        data=json.dumps(params).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=SERVE_CLIENT_TIMEOUT_SECONDS) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.load(e).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        print(f"Error from the report server: {message}")
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Error: could not reach a report server at {server_url} ({e}). Start one with: py run_report.py --serve")
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Run GA4 reports through a report server started with run_report.py --serve.')
+    parser.add_argument('-p', '--property-id', type=str, required=True, help='The GA4 property ID to report on.')
+    parser.add_argument('-r', '--report', type=str, required=True, help='The report name (e.g. "top_cities_report"), or several comma-separated names.')
+    parser.add_argument('-sd', '--start-date', type=str, help='Start date for the report in YYYY-MM-DD format.')
+    parser.add_argument('-ed', '--end-date', type=str, help='End date for the report in YYYY-MM-DD format.')
+    parser.add_argument('--last-complete-months', type=int, metavar='N', help='Report the last N complete calendar months side by side instead of a date range.')
+    parser.add_argument('-o', '--output-format', type=str, default='console', choices=['console', 'csv', 'html', 'csv_html', 'jsonl', 'jsonl_stdout', 'csv_gz', 'parquet', 'arrow'], help='Output format, as in run_report.py (default: console).')
+    parser.add_argument('--no-cache', action='store_true', help='Make the server run the report again instead of answering from memory or the report cache.')
+    parser.add_argument('--head', type=int, metavar='N', help='Print only the first N rows of each report to the console.')
+    parser.add_argument('--no-pager', action='store_true', help='Print console output straight to the terminal instead of through a pager.')
+    parser.add_argument('--port', type=int, default=SERVE_PORT, help=f'Port of the report server (default: {SERVE_PORT}).')
+    args = parser.parse_args()
+    if not args.last_complete_months and not (args.start_date and args.end_date):
+        parser.error("Give --start-date and --end-date, or --last-complete-months.")
+    if args.output_format == "jsonl_stdout":
+        # stdout carries only the JSON Lines rows, so status messages go to stderr
+        sys.stdout = sys.stderr
+
+    params = {
+        "property_id": args.property_id,
+        "report": args.report,
+        "no_cache": args.no_cache,
+    }
+    if args.last_complete_months:
+        params["last_complete_months"] = args.last_complete_months
+    else:
+        params["start_date"], params["end_date"] = args.start_date, args.end_date
+
+    response = request_reports(f"http://{SERVE_HOST}:{args.port}", params)
+    if response is None:
+        sys.exit(1)
+
+    output_function = run_report._configure_console_output(run_report._get_output_function_from_args(args.output_format), args)
+    failed = False
+    for report_module_name, report_data in response["reports"].items():
+        if not report_data:
+            print(f"Report generation failed: {report_module_name}.")
+            failed = True
+            continue
+        for entry in (report_data if isinstance(report_data, list) else [report_data]):
+            table = report_table.from_cache_entry(entry)
+            table['date_range'] = response["date_range"]
+            output_function(table, response["property"], response["start_date"], response["end_date"])
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import hashlib
+import itertools
+import json
+import profiler
+import report_table
+from datetime import datetime
+from operator import attrgetter
+
+from settings import REPORT_PAGE_SIZE # Import REPORT_PAGE_SIZE from settings.py
+
+# Bump whenever extract_response changes what it stores, so cached results
+# produced by an older parser are never served again.
+# 2: cached reports are stored as columnar ReportTables.
+PARSER_VERSION = 2
+
+# A report spec is a plain dictionary describing a report declaratively:
+#
+#   REPORT_SPEC = {
+#       "title": "Top 25 Pages by Views",
+#       "dimensions": ["pagePath"],
+#       "metrics": ["screenPageViews"],
+#       "order_bys": [{"metric": "screenPageViews", "desc": True}],  # or {"dimension": ...}
+#       "limit": 25,                                                  # optional, otherwise every row is paged in
+#       "headers": ["Page Path", "Screen Page Views"],                # optional, defaults to API names
+#       "formatters": {"engagementRate": "percent"},                  # optional, per column
+#   }
+#
+# Because the engine builds every request itself, specs can be inspected,
+# validated up front and batched together without calling the module.
+
+def _format_percent(value):
+    """Formats a ratio such as '0.6543' as a percentage with two decimal places ('65.43%')."""
+    try:
+        return f"{float(value) * 100:.2f}%"
+    except (ValueError, TypeError):
+        return value
+
+# Named column formatters that specs can refer to.
+FORMATTERS = {
+    "percent": _format_percent,
+}
+
+# Column types attached to report data ("column_types"), so outputs can pick one
+# formatter per column instead of guessing each cell's type. Dimensions are "string";
+# metrics take the type GA4 reports in the metric header.
+METRIC_COLUMN_TYPES = {
+    "TYPE_INTEGER": "integer",
+    "TYPE_CURRENCY": "currency",
+}
+
+# GA4 types of common metrics, so a streamed report's column types are known before its
+# first page arrives. Specs can declare others with "metric_types"; any metric in neither
+# is treated as a float, which holds integers too.
+METRIC_TYPES = {
+    "activeUsers": "TYPE_INTEGER",
+    "totalUsers": "TYPE_INTEGER",
+    "newUsers": "TYPE_INTEGER",
+    "sessions": "TYPE_INTEGER",
+    "engagedSessions": "TYPE_INTEGER",
+    "screenPageViews": "TYPE_INTEGER",
+    "eventCount": "TYPE_INTEGER",
+    "transactions": "TYPE_INTEGER",
+    "ecommercePurchases": "TYPE_INTEGER",
+    "engagementRate": "TYPE_FLOAT",
+    "bounceRate": "TYPE_FLOAT",
+    "averageSessionDuration": "TYPE_SECONDS",
+    "userEngagementDuration": "TYPE_SECONDS",
+    "purchaseRevenue": "TYPE_CURRENCY",
+    "totalRevenue": "TYPE_CURRENCY",
+}
+
+def _metric_column_type(metric_type):
+    """Returns the column type for a GA4 metric type name such as 'TYPE_INTEGER' or 'TYPE_SECONDS'."""
+    if not metric_type or metric_type == "METRIC_TYPE_UNSPECIFIED":
+        return "float"
+    return METRIC_COLUMN_TYPES.get(metric_type, "float")
+
+def _formatted_column_type(formatter, column_type):
+    """Returns the type of a column after a spec formatter has been applied to it."""
+    if formatter is None:
+        return column_type
+    # Formatted values are display strings; "percent" keeps its name so outputs know it is numeric
+    return "percent" if formatter == "percent" else "string"
+
+def spec_metric_types(spec):
+    """Returns the declared GA4 type of each of a spec's metrics (None where unknown), from its "metric_types" or METRIC_TYPES."""
+    declared_types = spec.get("metric_types", {})
+    return [declared_types.get(metric, METRIC_TYPES.get(metric)) for metric in spec["metrics"]]
+
+def get_spec(report_module):
+    """Returns the validated REPORT_SPEC of a report module, or None if the module doesn't declare one."""
+    spec = getattr(report_module, "REPORT_SPEC", None)
+    if spec is not None:
+        validate_spec(spec)
+    return spec
+
+def validate_spec(spec):
+    """Raises ValueError if a report spec is incomplete or refers to unknown columns or formatters."""
+    title = spec.get("title", "Report")
+    dimensions = spec.get("dimensions", [])
+    metrics = spec.get("metrics", [])
+    if not spec.get("title"):
+        raise ValueError("Report spec is missing a title.")
+    if not metrics:
+        raise ValueError(f"Report spec '{title}' must list at least one metric.")
+
+    columns = list(dimensions) + list(metrics)
+    if len(set(columns)) != len(columns):
+        raise ValueError(f"Report spec '{title}' lists the same column more than once.")
+    if "headers" in spec and len(spec["headers"]) != len(columns):
+        raise ValueError(f"Report spec '{title}' has {len(spec['headers'])} headers for {len(columns)} columns.")
+
+    for order_by in spec.get("order_bys", []):
+        if "metric" in order_by and order_by["metric"] not in metrics:
+            raise ValueError(f"Report spec '{title}' orders by metric '{order_by['metric']}' which it doesn't request.")
+        if "dimension" in order_by and order_by["dimension"] not in dimensions:
+            raise ValueError(f"Report spec '{title}' orders by dimension '{order_by['dimension']}' which it doesn't request.")
+        if ("metric" in order_by) == ("dimension" in order_by):
+            raise ValueError(f"Report spec '{title}' has an order_by that must name exactly one metric or dimension.")
+
+    for metric in spec.get("metric_types", {}):
+        if metric not in metrics:
+            raise ValueError(f"Report spec '{title}' declares a type for unknown metric '{metric}'.")
+
+    for column, formatter in spec.get("formatters", {}).items():
+        if column not in columns:
+            raise ValueError(f"Report spec '{title}' has a formatter for unknown column '{column}'.")
+        if not callable(formatter) and formatter not in FORMATTERS:
+            raise ValueError(f"Report spec '{title}' uses unknown formatter '{formatter}'.")
+
+def build_request_fields(spec, property_id, start_date, end_date):
+    """Returns the fields of the RunReportRequest described by a report spec, as a plain dictionary."""
+    order_bys = []
+    for order_by in spec.get("order_bys", []):
+        if "metric" in order_by:
+            order_bys.append({"metric": {"metric_name": order_by["metric"]}, "desc": order_by.get("desc", False)})
+        else:
+            order_bys.append({"dimension": {"dimension_name": order_by["dimension"]}, "desc": order_by.get("desc", False)})
+
+    request_fields = {
+        "property": f"properties/{property_id}",
+        "dimensions": [{"name": dimension} for dimension in spec.get("dimensions", [])],
+        "metrics": [{"name": metric} for metric in spec["metrics"]],
+        "date_ranges": [{"start_date": start_date, "end_date": end_date}],
+        "order_bys": order_bys,
+    }
+    # Without an explicit limit the API silently stops at its default row cap,
+    # so reports that want every row ask for full pages and follow the offsets.
+    request_fields["limit"] = spec.get("limit") or REPORT_PAGE_SIZE
+    return request_fields
+
+def build_request(spec, property_id, start_date, end_date):
+    """Builds the RunReportRequest described by a report spec."""
+    return request_from_fields(build_request_fields(spec, property_id, start_date, end_date))
+
+def request_from_fields(request_fields):
+    """Builds a RunReportRequest from the fields returned by build_request_fields."""
+    # Imported here so specs can be validated and fingerprinted without loading the client library
+    from google.analytics.data_v1beta.types import RunReportRequest
+    return RunReportRequest(request_fields)
+
+def request_fingerprint(request_fields):
+    """
+    Returns a content hash of a request and the parser version.
+    Identical requests share a fingerprint whichever report issues them,
+    and any change to the request (or the parser) produces a new one.
+    """
+    canonical_request = json.dumps(
+        {"request": request_fields, "parser_version": PARSER_VERSION},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+
+def _response_pb(response):
+    """Returns the raw protobuf message behind a proto-plus response, or the response itself if it already is one."""
+    response_class = type(response)
+    return response_class.pb(response) if hasattr(response_class, "pb") else response
+
+def extract_response(response):
+    """
+    Extracts the raw values from a RunReportResponse, independent of any spec.
+    Returns a dict with the API column names, metric types and rows of string values.
+    """
+    with profiler.phase("parse"):
+        # Rows are read from the underlying protobuf message: going through proto-plus wraps every
+        # row and cell in a Python object first, which is most of the cost of a large response.
+        # The few headers are read through proto-plus for its enum names.
+        value_of = attrgetter("value")
+        raw_report = {
+            "dimension_headers": [header.name for header in response.dimension_headers],
+            "metric_headers": [header.name for header in response.metric_headers],
+            "metric_types": [header.type_.name for header in response.metric_headers],
+            "rows": [
+                [*map(value_of, row.dimension_values), *map(value_of, row.metric_values)]
+                for row in _response_pb(response).rows
+            ],
+            "row_count": response.row_count,
+        }
+    profiler.count("rows", len(raw_report["rows"]))
+    return raw_report
+
+def iter_following_pages(data_client, request, response):
+    """Yields the responses for the pages after the given one, until row_count rows have been read."""
+    offset = request.offset + len(response.rows)
+    row_count = response.row_count
+    while response.rows and offset < row_count:
+        page_request = type(request)(request)
+        page_request.offset = offset
+        response = data_client.run_report(page_request)
+        yield response
+        offset += len(response.rows)
+
+def extract_all_rows(spec, response, request, data_client):
+    """Extracts a response, following the remaining pages when the spec has no row limit."""
+    raw_report = extract_response(response)
+    if not spec.get("limit"):
+        for page_response in iter_following_pages(data_client, request, response):
+            raw_report["rows"].extend(extract_response(page_response)["rows"])
+    return raw_report
+
+def stream_spec(spec, property_id, data_client, start_date, end_date):
+    """
+    Runs the report described by a spec page by page and returns it in the standardized format,
+    with "rows" as an iterator that yields formatted rows as each page arrives. "tables" iterates
+    over the same pages as typed ReportTables instead, for outputs that keep column types; a
+    writer reads one or the other. Only one page of rows is held in memory at a time.
+    Column types come from the spec's declared metric types, since the API only reports them with
+    the first page: "column_types" describes the formatted rows and "table_column_types" the
+    unformatted columns of the tables. Errors are printed and raised from the iterator.
+    """
+    headers = list(spec.get("headers", list(spec.get("dimensions", [])) + list(spec["metrics"])))
+    formatters = spec.get("formatters", {})
+    dimension_types = ["string"] * len(spec.get("dimensions", []))
+    metric_types = spec_metric_types(spec)
+    metric_column_types = [_metric_column_type(metric_type) for metric_type in metric_types]
+    # Display types of undeclared metrics (None) are still inferred from the rows, so whole numbers print as integers
+    column_types = dimension_types + [
+        _formatted_column_type(formatters.get(metric), column_type if metric_type else None)
+        for metric, metric_type, column_type in zip(spec["metrics"], metric_types, metric_column_types)
+    ]
+    tables = _iter_spec_tables(spec, property_id, data_client, start_date, end_date)
+    return {
+        "title": spec["title"],
+        "headers": headers,
+        "column_types": column_types,
+        "table_column_types": dimension_types + metric_column_types,
+        "rows": itertools.chain.from_iterable(table.iter_rows() for table in tables),
+        "tables": tables,
+    }
+
+def _iter_spec_tables(spec, property_id, data_client, start_date, end_date):
+    """
+    Yields a spec's report one page at a time, each page presented as a ReportTable.
+    Errors are printed and re-raised, so the output being written fails instead of ending early as if complete.
+    """
+    request = build_request(spec, property_id, start_date, end_date)
+    rows_read = 0
+    try:
+        response = data_client.run_report(request)
+        pages = [response] if spec.get("limit") else _chain_pages(data_client, request, response)
+        for page_response in pages:
+            page_table = present(spec, extract_response(page_response))
+            rows_read += page_table.row_total
+            yield page_table
+    except Exception as e:
+        print(f"Error running {spec['title']} after {rows_read:,} rows: {e}. The output is incomplete.")
+        raise
+    print(f"Streamed {rows_read:,} rows for {spec['title']}.")
+
+def _chain_pages(data_client, request, response):
+    """Yields the first response followed by every following page."""
+    yield response
+    yield from iter_following_pages(data_client, request, response)
+
+def table_from_raw(raw_report):
+    """Parses raw extracted report data into a ReportTable with the API column names, typed by the metric headers."""
+    metric_types = raw_report.get("metric_types") or [None] * len(raw_report["metric_headers"])
+    with profiler.phase("parse"):
+        return report_table.ReportTable.from_rows(
+            None,
+            raw_report["dimension_headers"] + raw_report["metric_headers"],
+            ["string"] * len(raw_report["dimension_headers"]) + [_metric_column_type(metric_type) for metric_type in metric_types],
+            raw_report["rows"],
+            row_count=raw_report.get("row_count"),
+        )
+
+def _resolve_formatter(spec, column):
+    """Returns the callable formatter a spec sets for a column, or None."""
+    formatter = spec.get("formatters", {}).get(column)
+    if formatter is not None and not callable(formatter):
+        formatter = FORMATTERS[formatter]
+    return formatter
+
+def present(spec, raw_report):
+    """
+    Applies a spec's title, headers and column formatters to raw report data, returning a ReportTable.
+    raw_report is either raw extracted report data or a table from table_from_raw (e.g. from the cache).
+    The table's columns are shared, not copied, and formatters are applied as rows are read.
+    """
+    raw_table = raw_report if isinstance(raw_report, report_table.ReportTable) else table_from_raw(raw_report)
+    api_headers = raw_table.headers
+
+    # Resolve the formatter for each column once, rather than per cell
+    column_types = list(raw_table.column_types)
+    column_formatters = []
+    for index, column in enumerate(api_headers):
+        column_types[index] = _formatted_column_type(spec.get("formatters", {}).get(column), column_types[index])
+        column_formatters.append(_resolve_formatter(spec, column))
+
+    return raw_table.with_presentation(spec["title"], list(spec.get("headers", api_headers)), column_types, column_formatters)
+
+def present_monthly(spec, month_reports, months):
+    """
+    Pivots per-month raw reports into one month-by-month table per metric.
+    Rows are the spec's dimension values and columns are the months (e.g. 'Dec 24', 'Jan 25').
+    Rows are ordered by the spec's order_bys, using a metric's total across the months,
+    and the spec's limit applies to the pivoted rows.
+    Returns a list of ReportTables, one per metric.
+    """
+    dimensions = list(spec.get("dimensions", []))
+    metrics = list(spec["metrics"])
+    headers = list(spec.get("headers", dimensions + metrics))
+    month_labels = [datetime.strptime(month, '%Y-%m').strftime('%b %y') for month in months]
+    metric_types = next((month_reports[month]["metric_types"] for month in months if month_reports[month]["metric_types"]), [None] * len(metrics))
+
+    # values[dimension values][metric index][month index]
+    values = {}
+    for month_index, month in enumerate(months):
+        for row in month_reports[month]["rows"]:
+            key = tuple(row[:len(dimensions)])
+            if key not in values:
+                values[key] = [[None] * len(months) for _ in metrics]
+            for metric_index in range(len(metrics)):
+                values[key][metric_index][month_index] = row[len(dimensions) + metric_index]
+
+    def total(key, metric_index):
+        return sum(float(value) for value in values[key][metric_index] if value is not None)
+
+    keys = list(values)
+    for order_by in reversed(spec.get("order_bys", [])):
+        if "metric" in order_by:
+            metric_index = metrics.index(order_by["metric"])
+            keys.sort(key=lambda key: total(key, metric_index), reverse=order_by.get("desc", False))
+        else:
+            dimension_index = dimensions.index(order_by["dimension"])
+            keys.sort(key=lambda key: key[dimension_index], reverse=order_by.get("desc", False))
+    if spec.get("limit"):
+        keys = keys[:spec["limit"]]
+
+    tables = []
+    for metric_index, metric in enumerate(metrics):
+        metric_column_type = _metric_column_type(metric_types[metric_index])
+        formatter = _resolve_formatter(spec, metric)
+        rows = [
+            list(key) + ["0" if value is None else value for value in values[key][metric_index]]
+            for key in keys
+        ]
+        table = report_table.ReportTable.from_rows(
+            f"{spec['title']} - {headers[len(dimensions) + metric_index]} by Month",
+            headers[:len(dimensions)] + month_labels,
+            ["string"] * len(dimensions) + [metric_column_type] * len(months),
+            rows,
+            formatters=[None] * len(dimensions) + [formatter] * len(months),
+        )
+        month_column_type = _formatted_column_type(spec.get("formatters", {}).get(metric), table.column_types[-1] if months else metric_column_type)
+        table.column_types = table.column_types[:len(dimensions)] + [month_column_type] * len(months)
+        tables.append(table)
+    return tables
+
+def parse_response(spec, response):
+    """Converts a RunReportResponse into the standardized report data structure for a spec."""
+    return present(spec, extract_response(response))
+
+def run_spec(spec, property_id, data_client, start_date, end_date):
+    """Runs the report described by a spec and returns it in the standardized format, or None on error."""
+    request = build_request(spec, property_id, start_date, end_date)
+
+    try:
+        response = data_client.run_report(request)
+        raw_report = extract_all_rows(spec, response, request, data_client)
+    except Exception as e:
+        print(f"Error running {spec['title']}: {e}")
+        return None
+
+    return present(spec, raw_report)
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from settings import SERVE_HOST, SERVE_PORT, SERVE_RESULT_CACHE_ENTRIES, SERVE_RESULT_CACHE_BYTES # Import settings from settings.py
+
+# Daemon mode (see --serve in run_report.py and report_client.py). A single long-running
+# process keeps what every run_report.py invocation would otherwise rebuild: the imported
+# client libraries, the credentials and gRPC channels in the ga4_client pool, the property
+# catalogue, and the most recent reports, held here in a least-recently-used store bounded by
+# both entry count and serialized size.
+#
+#   POST /report   {"property_id": ..., "report": ..., "start_date": ..., "end_date": ...}
+#                  -> {"property": ..., "date_range": ..., "reports": {module: table}}
+#   GET  /health   -> uptime and result store counters
+#
+# Tables travel in the report cache's columnar form (ReportTable.to_cache), so the client
+# rebuilds them without reparsing a value and writes them with the usual output functions.
+# There is no authentication, so the server only listens on SERVE_HOST (localhost by default).
+
+class ReportRequestError(ValueError):
+    """Raised by the report handler for requests that can't be run; answered with HTTP 400."""
+
+_results_lock = threading.Lock()
+_results = OrderedDict() # result key -> (expiry time or None, size in bytes, result), least recently used first
+_results_bytes = 0 # total serialized size of the stored results
+_stats = {
+    "started_at": time.time(),
+    "requests": 0,
+    "errors": 0,
+    "result_hits": 0,
+    "result_misses": 0,
+}
+
+def get_result(key):
+    """Returns the stored result for key and marks it recently used, or None if it is missing or expired."""
+    global _results_bytes
+    with _results_lock:
+        entry = _results.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.time():
+            del _results[key]
+            _results_bytes -= entry[1]
+            entry = None
+        if entry is None:
+            _stats["result_misses"] += 1
+            return None
+        _results.move_to_end(key)
+        _stats["result_hits"] += 1
+        return entry[2]
+
+def put_result(key, result, ttl=None):
+    """
+    Stores a result for ttl seconds (None keeps it until evicted), then evicts the least recently used
+    results until the store is within both SERVE_RESULT_CACHE_ENTRIES and SERVE_RESULT_CACHE_BYTES.
+    Results are measured by their serialized JSON size; one larger than the whole byte budget isn't stored.
+    """
+    global _results_bytes
+    size = len(json.dumps(result, separators=(",", ":")))
+    with _results_lock:
+        previous_entry = _results.pop(key, None)
+        if previous_entry is not None:
+            _results_bytes -= previous_entry[1]
+        if size > SERVE_RESULT_CACHE_BYTES:
+            return
+        _results[key] = (time.time() + ttl if ttl is not None else None, size, result)
+        _results_bytes += size
+        while len(_results) > SERVE_RESULT_CACHE_ENTRIES or _results_bytes > SERVE_RESULT_CACHE_BYTES:
+            _, evicted_entry = _results.popitem(last=False)
+            _results_bytes -= evicted_entry[1]
+
+def get_server_stats():
+    """Returns the request and result store counters."""
+    with _results_lock:
+        stats = dict(_stats)
+        stats["uptime_seconds"] = time.time() - stats.pop("started_at")
+        stats["stored_results"] = len(_results)
+        stats["stored_bytes"] = _results_bytes
+        return stats
+
+def _count(name):
+    with _results_lock:
+        _stats[name] += 1
+
+
+class _ReportRequestHandler(BaseHTTPRequestHandler):
+    """Answers /report and /health with JSON, passing report requests to the server's handle_report."""
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", **get_server_stats()})
+        else:
+            self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+
+    def do_POST(self):
+        if self.path != "/report":
+            self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+            return
+        _count("requests")
+        try:
+            content_length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(content_length) or b"{}")
+            if not isinstance(params, dict):
+                raise ReportRequestError("The request body must be a JSON object.")
+            response = self.server.handle_report(params)
+        except (ReportRequestError, json.JSONDecodeError) as e:
+            _count("errors")
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            _count("errors")
+            print(f"Error answering report request: {e}")
+            self._send_json(500, {"error": f"The report server failed: {e}"})
+            return
+        self._send_json(200, response)
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        print(f"[{self.log_date_time_string()}] {self.address_string()} {format % args}")
+
+
+def serve(handle_report, host=SERVE_HOST, port=SERVE_PORT):
+    """
+    Serves report requests until interrupted (Ctrl+C). handle_report(params) gets the decoded
+    JSON body of each POST /report and returns the JSON-serialisable response; requests run concurrently.
+    """
+    server = ThreadingHTTPServer((host, port), _ReportRequestHandler)
+    server.daemon_threads = True
+    server.handle_report = handle_report
+    print(f"Report server listening on http://{host}:{server.server_port} (Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nReport server stopped.")
+    finally:
+        server.server_close()
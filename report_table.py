@@ -0,0 +1,319 @@
+import array
+
+# A ReportTable holds a report column by column instead of as rows of strings:
+#
+#   - string columns (dimensions, and anything already formatted for display) are
+#     dictionary-encoded: each distinct value is stored once and rows hold an index into it,
+#   - "integer" columns are arrays of 64-bit integers and "float"/"currency" columns arrays
+#     of doubles, parsed once when the table is built.
+#
+# Tables also answer the standardized report dictionary keys ("title", "headers",
+# "column_types", "rows", plus anything set later such as "date_range"), so report modules
+# and output functions written against plain dictionaries keep working unchanged.
+
+INTEGER_TYPECODE = "q"
+FLOAT_TYPECODE = "d"
+
+# Array typecode for each numeric column type; every other column type is dictionary-encoded.
+NUMERIC_TYPECODES = {
+    "integer": INTEGER_TYPECODE,
+    "float": FLOAT_TYPECODE,
+    "currency": FLOAT_TYPECODE,
+}
+
+# Marks cache entries written by ReportTable.to_cache.
+TABLE_CACHE_FORMAT = "columnar-1"
+
+class DictionaryColumn:
+    """A string column stored as its distinct values plus one array index per row."""
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Dictionary-encodes an iterable of strings."""
+        index = {}
+        values = []
+        codes = array.array("I")
+        for string in strings:
+            code = index.get(string)
+            if code is None:
+                code = index[string] = len(values)
+                values.append(string)
+            codes.append(code)
+        return cls(values, codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row_index):
+        return self.values[self.codes[row_index]]
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+
+def _float_to_string(value):
+    """Returns a float as the API would send it, without a trailing '.0' on whole numbers."""
+    string = repr(value)
+    return string[:-2] if string.endswith(".0") else string
+
+def _format_integer(value):
+    """Formats an integer with thousands separators."""
+    return f"{value:,}"
+
+def _format_float(value):
+    """Formats a float with thousands separators and two decimal places."""
+    return f"{value:,.2f}"
+
+def _build_column(values, column_type):
+    """Parses a column of string values for its type, returning (column, column_type)."""
+    typecode = NUMERIC_TYPECODES.get(column_type)
+    if typecode == INTEGER_TYPECODE:
+        try:
+            return array.array(INTEGER_TYPECODE, map(int, values)), column_type
+        except (ValueError, TypeError, OverflowError):
+            typecode, column_type = FLOAT_TYPECODE, "float"
+    if typecode == FLOAT_TYPECODE:
+        try:
+            return array.array(FLOAT_TYPECODE, map(float, values)), column_type
+        except (ValueError, TypeError):
+            column_type = "string"
+    return DictionaryColumn.from_strings(map(str, values)), ("string" if typecode else column_type)
+
+
+class ReportRows:
+    """A read-only sequence view of a table's rows, each a list of strings as the API returned them."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __len__(self):
+        return self._table.row_total
+
+    def __iter__(self):
+        return self._table.iter_rows()
+
+    def __getitem__(self, row_index):
+        if isinstance(row_index, slice):
+            return [self[i] for i in range(*row_index.indices(len(self)))]
+        if row_index < 0:
+            row_index += len(self)
+        if not 0 <= row_index < len(self):
+            raise IndexError("row index out of range")
+        return [to_string(column[row_index]) for to_string, column in zip(self._table._string_converters(), self._table.columns)]
+
+
+class ReportTable:
+    """A report stored as typed columns, usable wherever a report data dictionary is expected."""
+
+    def __init__(self, title, headers, column_types, columns, formatters=None, row_count=None):
+        self.title = title
+        self.headers = list(headers)
+        self.column_types = list(column_types)
+        self.columns = list(columns)
+        # Spec formatters (e.g. percent) applied to the string form of a column on the way out
+        self.formatters = list(formatters) if formatters else [None] * len(self.columns)
+        self.row_total = len(self.columns[0]) if self.columns else 0
+        # Total rows the API reported, which can exceed the rows held when a limit applies
+        self.row_count = self.row_total if row_count is None else row_count
+        # Other keys set through the dictionary view, such as "date_range"
+        self.extra = {}
+
+    @classmethod
+    def from_rows(cls, title, headers, column_types, rows, formatters=None, row_count=None):
+        """Builds a table from rows of string values, parsing each column once according to column_types."""
+        rows = list(rows)
+        column_values = list(zip(*rows)) if rows else [()] * len(headers)
+        columns = []
+        parsed_types = []
+        for values, column_type in zip(column_values, column_types):
+            column, column_type = _build_column(values, column_type)
+            columns.append(column)
+            parsed_types.append(column_type)
+        return cls(title, headers, parsed_types, columns, formatters=formatters, row_count=row_count)
+
+    @classmethod
+    def from_report_data(cls, report_data):
+        """Returns report data as a table, converting a standardized report dictionary if needed."""
+        if isinstance(report_data, cls):
+            return report_data
+        headers = report_data.get("headers", [])
+        table = cls.from_rows(
+            report_data.get("title", "Report"),
+            headers,
+            report_data.get("column_types") or ["string"] * len(headers),
+            report_data.get("rows", []),
+        )
+        table.extra.update({key: value for key, value in report_data.items() if key not in ("title", "headers", "column_types", "rows")})
+        return table
+
+    def with_presentation(self, title, headers, column_types, formatters):
+        """Returns a table sharing this table's columns under a different title, headers and formatters."""
+        return ReportTable(title, headers, column_types, self.columns, formatters=formatters, row_count=self.row_count)
+
+    def _string_converters(self):
+        """Returns, per column, the function turning a stored value into its string form."""
+        converters = []
+        for column, formatter in zip(self.columns, self.formatters):
+            if isinstance(column, DictionaryColumn):
+                to_string = str
+            elif column.typecode == INTEGER_TYPECODE:
+                to_string = str
+            else:
+                to_string = _float_to_string
+            if formatter is not None:
+                to_string = lambda value, to_string=to_string, formatter=formatter: formatter(to_string(value))
+            converters.append(to_string)
+        return converters
+
+    def iter_rows(self):
+        """Yields each row as a list of strings, with any spec formatters applied."""
+        column_iterators = []
+        for column, to_string in zip(self.columns, self._string_converters()):
+            if isinstance(column, DictionaryColumn) and to_string is str:
+                column_iterators.append(iter(column))
+            else:
+                column_iterators.append(map(to_string, column))
+        return map(list, zip(*column_iterators))
+
+    def iter_display_rows(self):
+        """Yields each row formatted for display: numbers with thousands separators, floats to two places."""
+        column_iterators = []
+        for column, to_string, formatter in zip(self.columns, self._string_converters(), self.formatters):
+            if formatter is not None:
+                column_iterators.append(map(to_string, column))
+            elif isinstance(column, DictionaryColumn):
+                column_iterators.append(iter(column))
+            elif column.typecode == INTEGER_TYPECODE:
+                column_iterators.append(map(_format_integer, column))
+            else:
+                column_iterators.append(map(_format_float, column))
+        return map(list, zip(*column_iterators))
+
+    def output_columns(self):
+        """Returns the columns as they should be written out: formatted columns become dictionary-encoded strings."""
+        return [
+            DictionaryColumn.from_strings(map(to_string, column)) if formatter is not None else column
+            for column, formatter, to_string in zip(self.columns, self.formatters, self._string_converters())
+        ]
+
+    def to_cache(self):
+        """
+        Returns a JSON-serialisable form of the table (see from_cache_entry).
+        Formatters can't be stored, so formatted columns are saved as their formatted strings.
+        """
+        columns = []
+        for column in self.output_columns():
+            if isinstance(column, DictionaryColumn):
+                columns.append({"values": column.values, "codes": column.codes.tolist()})
+            else:
+                columns.append({"typecode": column.typecode, "data": column.tolist()})
+        return {
+            "table_format": TABLE_CACHE_FORMAT,
+            "title": self.title,
+            "headers": self.headers,
+            "column_types": self.column_types,
+            "row_count": self.row_count,
+            "columns": columns,
+        }
+
+    @classmethod
+    def from_cache(cls, entry):
+        """Rebuilds a table saved with to_cache, without reparsing any values."""
+        columns = [
+            DictionaryColumn(column["values"], array.array("I", column["codes"])) if "values" in column
+            else array.array(column["typecode"], column["data"])
+            for column in entry["columns"]
+        ]
+        return cls(entry["title"], entry["headers"], entry["column_types"], columns, row_count=entry["row_count"])
+
+    def to_dict(self):
+        """Returns the report as a standardized report dictionary with rows as lists of strings."""
+        report_data = {
+            "title": self.title,
+            "headers": list(self.headers),
+            "column_types": list(self.column_types),
+            "rows": list(self.iter_rows()),
+        }
+        report_data.update(self.extra)
+        return report_data
+
+    # Dictionary view, so code written for report data dictionaries accepts tables
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        if key == "title":
+            return self.title
+        if key == "headers":
+            return self.headers
+        if key == "column_types":
+            return self.column_types
+        if key == "rows":
+            return ReportRows(self)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in ("title", "headers", "column_types"):
+            setattr(self, key, value)
+        elif key == "rows":
+            raise TypeError("The rows of a ReportTable can't be replaced.")
+        else:
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in ("title", "headers", "column_types", "rows") or key in self.extra
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return ["title", "headers", "column_types", "rows"] + list(self.extra)
+
+
+def from_cache_entry(entry):
+    """Returns a cached value as a ReportTable if it was saved with to_cache, otherwise unchanged."""
+    if isinstance(entry, dict) and entry.get("table_format") == TABLE_CACHE_FORMAT:
+        return ReportTable.from_cache(entry)
+    return entry
+
+def rollup_metric_headers(table):
+    """Returns the headers of the columns a rollup can sum: numeric columns without a spec formatter (e.g. not rates)."""
+    return [
+        header
+        for header, column, formatter in zip(table.headers, table.columns, table.formatters)
+        if isinstance(column, array.array) and formatter is None
+    ]
+
+def add_to_rollup(totals, table, key_header, metric_headers):
+    """
+    Adds a table's rows to a rollup in one pass: totals is a dict of key_header value -> list of
+    sums of metric_headers, updated in place, so rows from many tables can be rolled up as they arrive.
+    """
+    key_column = table.columns[table.headers.index(key_header)]
+    metric_columns = [table.columns[table.headers.index(header)] for header in metric_headers]
+    empty_sums = [0] * len(metric_columns)
+    for key, *values in zip(key_column, *metric_columns):
+        sums = totals.get(key)
+        if sums is None:
+            sums = totals[key] = list(empty_sums)
+        for index, value in enumerate(values):
+            sums[index] += value
+
+def rollup_table(title, key_header, metric_headers, metric_column_types, totals):
+    """Returns a rollup's totals as a table of key_header plus the summed metrics, largest first metric first."""
+    keys = sorted(totals, key=lambda key: totals[key][0] if metric_headers else key, reverse=bool(metric_headers))
+    columns = [DictionaryColumn.from_strings(map(str, keys))]
+    column_types = ["string"]
+    for index, column_type in enumerate(metric_column_types):
+        sums = [totals[key][index] for key in keys]
+        if column_type == "integer" and not all(isinstance(value, int) for value in sums):
+            column_type = "float" # Some tables held the metric as a float
+        columns.append(array.array(NUMERIC_TYPECODES.get(column_type, FLOAT_TYPECODE), sums))
+        column_types.append(column_type)
+    return ReportTable(title, [key_header] + list(metric_headers), column_types, columns)
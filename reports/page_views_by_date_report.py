@@ -0,0 +1,22 @@
+import report_engine
+
+# Screen page views for every page on every day of the range. This can run to
+# hundreds of thousands of rows, so it has no limit and pages through the API;
+# use --stream with csv or jsonl output to write it with flat memory use.
+REPORT_SPEC = {
+    "title": "Page Views by Date",
+    "dimensions": ["date", "pagePath"],
+    "metrics": ["screenPageViews"],
+    "order_bys": [
+        {"dimension": "date", "desc": False},
+        {"dimension": "pagePath", "desc": False},
+    ],
+    "headers": ["Date", "Page Path", "Screen Page Views"],
+}
+
+def run_report(property_id, data_client, start_date, end_date):
+    """
+    Runs a report of screen page views by page and date for a given date range.
+    Returns the report data in a standardized format.
+    """
+    return report_engine.run_spec(REPORT_SPEC, property_id, data_client, start_date, end_date)
@@ -1,42 +1,45 @@
-from google.analytics.admin_v1alpha.types import ListPropertiesRequest
 import ga4_client
 import output_manager # Import our new output manager
+import property_catalogue
+import report_engine
+import report_table
+import cache_store
+import partitioned_cache
+import profiler
+import quota_manager
 import os
 import sys
 import importlib.util
 from datetime import datetime, timedelta, date
 import json # New import for caching
 import hashlib # New import for caching
-import time
 import argparse # New import for command-line arguments
+import functools
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 if sys.platform == "win32":
     import msvcrt
 
-from settings import CACHE_DURATION # Import CACHE_DURATION from settings.py
+from settings import ALL_PROPERTIES_WORKERS, SERVE_PORT # Import settings from settings.py
 
-def _cleanup_cache():
-    """Deletes stale cache files from the cache directory."""
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        return
+# The Data API accepts at most five requests in one batch_run_reports call.
+MAX_BATCH_SIZE = 5
+
+# Output formats that can be written row by row with --stream.
+STREAMING_OUTPUT_FORMATS = ("console", "csv", "csv_gz", "jsonl", "jsonl_stdout", "parquet", "arrow")
 
-    current_time = time.time()
-    for filename in os.listdir(cache_dir):
-        filepath = os.path.join(cache_dir, filename)
-        if os.path.isfile(filepath):
-            file_mtime = os.path.getmtime(filepath)
-            if (current_time - file_mtime) > CACHE_DURATION:
-                try:
-                    os.remove(filepath)
-                    print(f"Cleaned up stale cache file: {filepath}")
-                except Exception as e:
-                    print(f"Error cleaning up cache file {filepath}: {e}") 
+def _cleanup_cache():
+    """Deletes stale entries from the report cache."""
+    try:
+        cache_store.get_cache_store().cleanup()
+    except Exception as e:
+        print(f"Error cleaning up the cache: {e}")
 
 
 def get_available_reports():
     """Dynamically discovers available reports in the 'reports' directory."""
     reports = {}
-    reports_dir = "reports"
+    reports_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
     for filename in os.listdir(reports_dir):
         if filename.endswith(".py") and not filename.startswith("__"):
             report_name = filename[:-3] # Remove .py extension
@@ -46,6 +49,17 @@ def get_available_reports():
             }
     return reports
 
+def _get_reports_by_names(report_names_str):
+    """Retrieves report info for a comma-separated list of report names, or None if any name is invalid."""
+    selected_reports = []
+    for report_name in report_names_str.split(","):
+        report_info = _get_report_by_name(report_name.strip())
+        if not report_info:
+            return None
+        if report_info not in selected_reports:
+            selected_reports.append(report_info)
+    return selected_reports or None
+
 def _get_report_by_name(report_name_str):
     """Retrieves report info by its module name."""
     available_reports = get_available_reports()
@@ -54,8 +68,13 @@ def _get_report_by_name(report_name_str):
             return report_info
     return None
 
-def get_property_info_by_id(property_id_str):
-    """Fetches property info by ID using the Admin API."""
+def get_property_info_by_id(property_id_str, refresh=False):
+    """Looks up property info by ID in the property catalogue, falling back to the Admin API."""
+    catalogued_property = property_catalogue.find_property(property_id_str, refresh=refresh)
+    if catalogued_property:
+        return dict(catalogued_property)
+
+    # Not in the catalogue (e.g. access granted since it was loaded), so ask the API directly.
     admin_client = ga4_client.get_admin_client()
     if not admin_client:
         return None
@@ -69,53 +88,32 @@ def get_property_info_by_id(property_id_str):
         print(f"Error: Could not find or access property ID '{property_id_str}'. {e}")
         return None
 
-def get_all_properties():
-    """Fetches and returns a list of all available GA4 properties, sorted alphabetically."""
-    admin_client = ga4_client.get_admin_client()
-    if not admin_client:
-        return []
-
-    all_accounts = list(admin_client.list_accounts())
-    all_accounts.sort(key=lambda account: account.display_name)
-
-    if not all_accounts:
-        print("No GA4 accounts found that are accessible by this service account.")
+def get_all_properties(refresh=False):
+    """Returns a list of all available GA4 properties from the property catalogue, sorted alphabetically."""
+    all_properties = property_catalogue.get_all_properties(refresh=refresh)
+    if not all_properties:
+        print("No GA4 properties found that are accessible by this service account.")
         return []
 
-    all_properties = []
-    for account in all_accounts:
-        request = ListPropertiesRequest(filter=f"ancestor:{account.name}")
-        account_properties = list(admin_client.list_properties(request=request))
-        
-        for prop in account_properties:
-            all_properties.append({
-                "display_name": prop.display_name,
-                "property_id": prop.name.split('/')[-1]
-            })
-
     # Sort all properties alphabetically by display name
-    all_properties.sort(key=lambda prop: prop['display_name'])
-    
-    return all_properties
+    return sorted(all_properties, key=lambda prop: prop['display_name'])
 
-def get_selected_property(cli_property_id=None):
+def get_selected_property(cli_property_id=None, refresh=False):
     """Presents a sorted, interactive menu to the user to select a GA4 property."""
     if cli_property_id:
-        selected_property = get_property_info_by_id(cli_property_id)
+        selected_property = get_property_info_by_id(cli_property_id, refresh=refresh)
         if selected_property:
             print(f"Using property ID from command-line: {selected_property['display_name']} (ID: {selected_property['property_id']})")
             return selected_property
         else:
             print(f"Invalid or inaccessible property ID '{cli_property_id}' provided via command-line. Falling back to interactive selection...")
 
-    admin_client = ga4_client.get_admin_client()
-    if not admin_client:
+    # Accounts are stored in the catalogue sorted alphabetically by display name
+    catalogue = property_catalogue.get_catalogue(refresh=refresh)
+    if not catalogue:
         return None
 
-    # Fetch and sort accounts alphabetically by display name
-    all_accounts = list(admin_client.list_accounts())
-    all_accounts.sort(key=lambda account: account.display_name)
-
+    all_accounts = catalogue["accounts"]
     if not all_accounts:
         print("No GA4 accounts found that are accessible by this service account.")
         return None
@@ -125,29 +123,22 @@ def get_selected_property(cli_property_id=None):
     
     print("\nAvailable GA4 Properties:")
     for account in all_accounts:
-        print(f"\n--- Account: {account.display_name} ---")
-        
-        # Fetch all properties for the account
-        request = ListPropertiesRequest(filter=f"ancestor:{account.name}")
-        account_properties = list(admin_client.list_properties(request=request))
+        print(f"\n--- Account: {account['display_name']} ---")
 
         # Sort properties: 'www' first, then alphabetically
         def sort_key(prop):
-            is_www = prop.display_name.lower().startswith('www')
-            return (0, prop.display_name) if is_www else (1, prop.display_name)
+            is_www = prop['display_name'].lower().startswith('www')
+            return (0, prop['display_name']) if is_www else (1, prop['display_name'])
         
-        account_properties.sort(key=sort_key)
+        account_properties = sorted(account['properties'], key=sort_key)
 
         if not account_properties:
             print("  No properties found for this account.")
             continue
 
         for prop in account_properties:
-            properties[str(property_list_counter)] = {
-                "display_name": prop.display_name,
-                "property_id": prop.name.split('/')[-1]
-            }
-            print(f"{property_list_counter}. {prop.display_name} (ID: {prop.name.split('/')[-1]})")
+            properties[str(property_list_counter)] = dict(prop)
+            print(f"{property_list_counter}. {prop['display_name']} (ID: {prop['property_id']})")
             property_list_counter += 1
     
     if not properties:
@@ -245,6 +236,20 @@ def get_selected_date_range(cli_start_date=None, cli_end_date=None):
         start_date = last_day_of_previous_month.replace(day=1)
         return start_date.strftime('%Y-%m-%d'), last_day_of_previous_month.strftime('%Y-%m-%d'), "Last Calendar Month", f"{start_date.strftime('%Y-%m-%d')} to {last_day_of_previous_month.strftime('%Y-%m-%d')}"
 
+def _get_last_complete_months(month_count):
+    """
+    Returns the last month_count complete calendar months as 'YYYY-MM' strings, oldest first,
+    with the start date, end date and a verbose date range string covering them.
+    """
+    month_start = date.today().replace(day=1)
+    months = []
+    for _ in range(month_count):
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+        months.insert(0, month_start.strftime('%Y-%m'))
+    start_date = f"{months[0]}-01"
+    end_date = (date.today().replace(day=1) - timedelta(days=1)).strftime('%Y-%m-%d')
+    return months, start_date, end_date, f"{start_date} to {end_date} (last {month_count} complete months)"
+
 def _get_output_function_from_args(output_format_str):
     """Maps a command-line output format string to its corresponding function."""
     output_formats_map = {
@@ -252,9 +257,20 @@ def _get_output_function_from_args(output_format_str):
         "csv": output_manager.save_to_csv,
         "html": output_manager.save_to_html,
         "csv_html": output_manager.save_to_csv_and_html,
+        "jsonl": output_manager.save_to_jsonl,
+        "jsonl_stdout": output_manager.write_jsonl_to_stdout,
+        "csv_gz": output_manager.save_to_csv_gz,
+        "parquet": output_manager.save_to_parquet,
+        "arrow": output_manager.save_to_arrow,
     }
     return output_formats_map.get(output_format_str.lower())
 
+def _configure_console_output(output_function, args):
+    """Applies the --head and --no-pager options when the output function prints to the console."""
+    if output_function is output_manager.print_to_console:
+        return functools.partial(output_manager.print_to_console, head=args.head, use_pager=not args.no_pager)
+    return output_function
+
 def get_selected_output_format(cli_output_format=None):
     """Presents an interactive menu to select the output format."""
     if cli_output_format:
@@ -271,6 +287,10 @@ def get_selected_output_format(cli_output_format=None):
         ("Save as CSV", output_manager.save_to_csv),
         ("Save as CSV & HTML (Default)", output_manager.save_to_csv_and_html),
         ("Save as HTML", output_manager.save_to_html),
+        ("Save as JSON Lines", output_manager.save_to_jsonl),
+        ("Save as Gzipped CSV", output_manager.save_to_csv_gz),
+        ("Save as Parquet (needs pyarrow)", output_manager.save_to_parquet),
+        ("Save as Arrow IPC (needs pyarrow)", output_manager.save_to_arrow),
     ]
 
     # Sort options alphabetically by display name
@@ -292,10 +312,8 @@ def get_selected_output_format(cli_output_format=None):
         else:
             print("Invalid selection. Please enter a valid number.")
 
-def run_dynamic_report(report_module_name, property_id, start_date, end_date, no_cache=False):
-    """Dynamically imports and runs a report module for a given date range, with caching."""
-    
-    # Generate cache key
+def _get_module_cache_key(report_module_name, property_id, start_date, end_date):
+    """Returns the cache key for modules whose requests the runner can't inspect, based on the module and dates."""
     cache_key_data = {
         "property_id": property_id,
         "report_module": report_module_name,
@@ -303,108 +321,476 @@ def run_dynamic_report(report_module_name, property_id, start_date, end_date, no
         "end_date": end_date
     }
     cache_key_string = json.dumps(cache_key_data, sort_keys=True)
-    cache_filename = hashlib.md5(cache_key_string.encode('utf-8')).hexdigest() + ".json"
-    cache_filepath = os.path.join("cache", cache_filename)
-
-    # Check cache
-    if not no_cache and os.path.exists(cache_filepath):
-        file_mtime = os.path.getmtime(cache_filepath)
-        if (time.time() - file_mtime) < CACHE_DURATION:
-            print(f"Loading report from cache: {cache_filepath}")
+    return hashlib.md5(cache_key_string.encode('utf-8')).hexdigest()
+
+def _load_cached_report(cache_key):
+    """Returns the cached report data if the entry exists and is fresh, otherwise None."""
+    store = cache_store.get_cache_store()
+    try:
+        with profiler.phase("cache_read"):
+            cached_report = store.get(cache_key)
+            if cached_report is not None:
+                cached_report = report_table.from_cache_entry(cached_report)
+    except Exception as e:
+        print(f"Error loading from cache: {e}. Re-running report.")
+        return None
+    if cached_report is not None:
+        print(f"Loading report from cache: {store.describe(cache_key)}")
+    return cached_report
+
+def _save_cached_report(cache_key, report_data, end_date):
+    """Saves report data to the cache if the report ran successfully, for as long as its end date warrants."""
+    if report_data:
+        store = cache_store.get_cache_store()
+        if isinstance(report_data, report_table.ReportTable):
+            report_data = report_data.to_cache()
+        try:
+            with profiler.phase("cache_write"):
+                store.set(cache_key, report_data, ttl=cache_store.ttl_for_end_date(end_date))
+            print(f"Report saved to cache: {store.describe(cache_key)}")
+        except Exception as e:
+            print(f"Error saving report to cache: {e}")
+
+def _run_batched_requests(pending_requests, property_id, data_client):
+    """
+    Runs requests for one property and date range with as few API calls as possible.
+    pending_requests is a dict of request key -> RunReportRequest.
+    Returns a dict of request key -> RunReportResponse (None if the request failed).
+    """
+    # Imported here so runs answered from the cache never load the client library
+    from google.analytics.data_v1beta.types import BatchRunReportsRequest
+
+    responses = {}
+    pending_items = list(pending_requests.items())
+    for batch_start in range(0, len(pending_items), MAX_BATCH_SIZE):
+        batch = pending_items[batch_start:batch_start + MAX_BATCH_SIZE]
+        if len(batch) == 1:
+            request_key, request = batch[0]
             try:
-                with open(cache_filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                responses[request_key] = data_client.run_report(request)
             except Exception as e:
-                print(f"Error loading cache file: {e}. Re-running report.")
+                print(f"An error occurred while running the report: {e}")
+                responses[request_key] = None
+            continue
+
+        print(f"Sending {len(batch)} reports for property ID {property_id} in one batch request.")
+        batch_request = BatchRunReportsRequest(
+            property=f"properties/{property_id}",
+            requests=[request for _, request in batch]
+        )
+        try:
+            batch_response = data_client.batch_run_reports(batch_request)
+        except Exception as e:
+            # Fall back to one request per report so a single bad request doesn't fail the whole batch
+            print(f"Batch request failed ({e}). Running the reports individually...")
+            for request_key, request in batch:
+                responses.update(_run_batched_requests({request_key: request}, property_id, data_client))
+            continue
+
+        # Responses come back in the same order as the requests
+        for (request_key, _), response in zip(batch, batch_response.reports):
+            responses[request_key] = response
+    return responses
+
+def run_dynamic_reports(report_module_names, property_id, start_date, end_date, no_cache=False):
+    """
+    Dynamically imports and runs several report modules for one property and date range, with caching.
+    Reports that aren't cached are sent together through batch_run_reports, up to MAX_BATCH_SIZE per call.
+    Returns a dict of report_module_name -> report_data (None if the report failed).
+
+    Declarative reports are cached under a fingerprint of the request they send, so reports
+    issuing identical requests share one cache entry (and one API call), and editing a
+    report's dimensions or metrics misses the cache automatically. The cache holds the raw
+    extracted rows as a columnar table; each report's title, headers and formatters are applied on the way out.
+    Reports with only additive metrics are cached per day instead (see partitioned_cache).
+    """
+    results = {}
+    pending_requests = {} # cache key -> request, shared by reports sending identical requests
+    pending_reports = []  # (report_module_name, cache key, parse_response(response, request, data_client), present)
+    legacy_reports = []   # (report_module_name, report_module, cache key)
+
+    for report_module_name in report_module_names:
+        try:
+            module_path = f"reports.{report_module_name}"
+            report_module = importlib.import_module(module_path)
+            spec = report_engine.get_spec(report_module)
+        except ImportError as e:
+            print(f"Error: Could not import report module '{report_module_name}'. {e}")
+            results[report_module_name] = None
+            continue
+        except ValueError as e:
+            print(f"Error: Invalid report spec in '{report_module_name}'. {e}")
+            results[report_module_name] = None
+            continue
+
+        if spec is not None and partitioned_cache.is_day_partitionable(spec):
+            # Additive reports are assembled from per-day cache entries, fetching only missing days
+            print(f"\nRunning '{report_module_name.replace('_', ' ').title()}' report for property ID: {property_id} (daily cache)")
+            raw_report = partitioned_cache.run_day_partitioned(
+                spec, property_id, start_date, end_date, ga4_client.get_data_client, no_cache=no_cache
+            )
+            results[report_module_name] = report_engine.present(spec, raw_report) if raw_report is not None else None
+            continue
+
+        if spec is not None:
+            request_fields = report_engine.build_request_fields(spec, property_id, start_date, end_date)
+            cache_key = report_engine.request_fingerprint(request_fields)
+            build_request = lambda request_fields=request_fields: report_engine.request_from_fields(request_fields)
+            parse_response = lambda response, request, data_client, spec=spec: report_engine.table_from_raw(
+                report_engine.extract_all_rows(spec, response, request, data_client)
+            )
+            present = lambda raw_table, spec=spec: report_engine.present(spec, raw_table)
+        else:
+            cache_key = _get_module_cache_key(report_module_name, property_id, start_date, end_date)
+            if hasattr(report_module, "build_request") and hasattr(report_module, "parse_response"):
+                build_request = lambda report_module=report_module: report_module.build_request(property_id, start_date, end_date)
+                parse_response = lambda response, request, data_client, report_module=report_module: report_module.parse_response(response)
+                present = lambda report_data: report_data
+            else:
+                build_request = None
+
+        # Check cache
+        if not no_cache:
+            cached_report = _load_cached_report(cache_key)
+            if cached_report is not None:
+                results[report_module_name] = present(cached_report) if build_request else cached_report
+                continue
 
-    # If not in cache or cache is stale, run report
+        print(f"\nRunning '{report_module_name.replace('_', ' ').title()}' report for property ID: {property_id} (API call)")
+        # Reports whose requests the runner can build are batched; others run on their own
+        if build_request:
+            if cache_key not in pending_requests:
+                pending_requests[cache_key] = build_request()
+            pending_reports.append((report_module_name, cache_key, parse_response, present))
+        else:
+            legacy_reports.append((report_module_name, report_module, cache_key))
+
+    if not pending_reports and not legacy_reports:
+        return results
+
+    # If not in cache or cache is stale, run the reports
     data_client = ga4_client.get_data_client()
     if not data_client:
-        return None
+        for report_module_name, *_ in pending_reports + legacy_reports:
+            results[report_module_name] = None
+        return results
 
-    try:
-        module_path = f"reports.{report_module_name}"
-        report_module = importlib.import_module(module_path)
-        print(f"\nRunning '{report_module_name.replace('_', ' ').title()}' report for property ID: {property_id} (API call)")
-        report_data = report_module.run_report(property_id, data_client, start_date, end_date)
-        
-        # Save to cache if report ran successfully
-        if report_data:
-            os.makedirs("cache", exist_ok=True)
-            with open(cache_filepath, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f)
-            print(f"Report saved to cache: {cache_filepath}")
-        
-        return report_data
+    responses = _run_batched_requests(pending_requests, property_id, data_client)
+    parsed_responses = {}
+    for report_module_name, cache_key, parse_response, present in pending_reports:
+        if responses.get(cache_key) is None:
+            results[report_module_name] = None
+            continue
+        try:
+            if cache_key not in parsed_responses:
+                parsed_responses[cache_key] = parse_response(responses[cache_key], pending_requests[cache_key], data_client)
+                # Save to cache if report ran successfully
+                _save_cached_report(cache_key, parsed_responses[cache_key], end_date)
+            results[report_module_name] = present(parsed_responses[cache_key])
+        except Exception as e:
+            print(f"An error occurred while parsing the report '{report_module_name}': {e}")
+            results[report_module_name] = None
+
+    for report_module_name, report_module, cache_key in legacy_reports:
+        try:
+            results[report_module_name] = report_module.run_report(property_id, data_client, start_date, end_date)
+        except Exception as e:
+            print(f"An error occurred while running the report: {e}")
+            results[report_module_name] = None
+        _save_cached_report(cache_key, results[report_module_name], end_date)
+
+    return results
 
-    except ImportError as e:
-        print(f"Error: Could not import report module '{report_module_name}'. {e}")
+def run_dynamic_report(report_module_name, property_id, start_date, end_date, no_cache=False):
+    """Dynamically imports and runs a report module for a given date range, with caching."""
+    return run_dynamic_reports([report_module_name], property_id, start_date, end_date, no_cache=no_cache)[report_module_name]
+
+def stream_dynamic_report(report_module_name, property_id, start_date, end_date):
+    """
+    Runs a declarative report page by page, returning report data whose "rows" is an iterator.
+    Rows are written by the output function as they arrive, so memory stays flat for very
+    large exports. Streamed reports bypass the cache.
+    """
+    try:
+        report_module = importlib.import_module(f"reports.{report_module_name}")
+        spec = report_engine.get_spec(report_module)
+    except (ImportError, ValueError) as e:
+        print(f"Error: Could not load report module '{report_module_name}'. {e}")
         return None
-    except Exception as e:
-        print(f"An error occurred while running the report: {e}")
+    if spec is None:
+        print(f"Error: '{report_module_name}' has no REPORT_SPEC, so it can't be streamed.")
         return None
 
-def run_report_for_all_properties(no_cache=False):
-    """Runs the Session Source / Medium report for all available properties and aggregates the data."""
-    print("Running Session Source / Medium report for all available properties...")
-    
-    all_properties = get_all_properties()
-    if not all_properties:
-        print("No properties found to run the report on.")
-        return
+    data_client = ga4_client.get_data_client()
+    if not data_client:
+        return None
 
-    # Use default date range (Last Calendar Month)
-    start_date, end_date, _, verbose_date_range_str = get_selected_date_range()
-    
-    # Use default output format (Save as CSV & HTML)
-    output_function = output_manager.save_to_csv_and_html
+    print(f"\nStreaming '{report_module_name.replace('_', ' ').title()}' report for property ID: {property_id} (API call)")
+    return report_engine.stream_spec(spec, property_id, data_client, start_date, end_date)
 
-    aggregated_rows = []
-    headers = []
+def run_monthly_report(report_module_name, property_id, months, no_cache=False):
+    """
+    Runs a declarative report broken down by month, fetching only the months not already cached.
+    Returns a list of report data dictionaries (one month-by-month table per metric), or None on error.
+    """
+    try:
+        report_module = importlib.import_module(f"reports.{report_module_name}")
+        spec = report_engine.get_spec(report_module)
+    except (ImportError, ValueError) as e:
+        print(f"Error: Could not load report module '{report_module_name}'. {e}")
+        return None
+    if spec is None:
+        print(f"Error: '{report_module_name}' has no REPORT_SPEC, so it can't be broken down by month.")
+        return None
+
+    print(f"\nRunning '{report_module_name.replace('_', ' ').title()}' report by month for property ID: {property_id}")
+    month_reports = partitioned_cache.run_month_partitioned(
+        spec, property_id, months, ga4_client.get_data_client, no_cache=no_cache
+    )
+    if month_reports is None:
+        return None
+    return report_engine.present_monthly(spec, month_reports, months)
 
-    for prop_info in all_properties:
-        print(f"\n--- Running report for: {prop_info['display_name']} ---")
-        report_data = run_dynamic_report(
+def _run_report_for_property(prop_info, start_date, end_date, no_cache=False):
+    """Runs the Session Source / Medium report for one property, never raising so other properties keep running."""
+    print(f"\n--- Running report for: {prop_info['display_name']} ---")
+    try:
+        return run_dynamic_report(
             'session_source_medium_report',
             prop_info['property_id'],
             start_date,
             end_date,
             no_cache=no_cache
         )
-        
-        if report_data and report_data['rows']:
-            # Set headers from the first successful report
-            if not headers:
-                headers = ["property_name"] + report_data['headers']
-
-            # Add property name to each row
-            for row in report_data['rows']:
-                aggregated_rows.append([prop_info['display_name']] + row)
+    except Exception as e:
+        print(f"Error running report for {prop_info['display_name']}: {e}")
+        return None
+
+def _iter_completed(executor, function, items, window):
+    """
+    Runs function over items on the executor, yielding (item, result) as each call finishes.
+    At most window calls are submitted ahead, so finished results never pile up waiting for a slow one.
+    """
+    items = iter(items)
+    pending = {} # future -> item
+    for item in itertools.islice(items, window):
+        pending[executor.submit(function, item)] = item
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            for next_item in itertools.islice(items, 1):
+                pending[executor.submit(function, next_item)] = next_item
+            yield item, future.result()
+
+def run_report_for_all_properties(no_cache=False, workers=ALL_PROPERTIES_WORKERS, refresh_properties=False, rollups=None):
+    """
+    Runs the Session Source / Medium report for all available properties and aggregates the data.
+    Each property's rows are appended to the aggregated CSV as soon as it finishes, so memory doesn't
+    grow with the number of properties and an interrupted run keeps every property already written.
+    The HTML report is rendered from the finished CSV. rollups is a list of column names (e.g.
+    sessionSourceMedium) to total the metrics by across all properties, in the same streaming pass.
+    """
+    print("Running Session Source / Medium report for all available properties...")
+    
+    # Rollup columns are checked against the report's headers before any property is fetched
+    spec = report_engine.get_spec(importlib.import_module("reports.session_source_medium_report"))
+    report_headers = list(spec.get("headers", list(spec.get("dimensions", [])) + list(spec["metrics"])))
+    valid_rollups = []
+    for rollup in rollups or []:
+        if rollup in report_headers:
+            valid_rollups.append(rollup)
         else:
-            print(f"No data returned for {prop_info['display_name']}.")
+            print(f"Can't roll up by '{rollup}': the report has no such column. Columns: {', '.join(report_headers)}")
 
-    if not aggregated_rows:
-        print("No data to generate a report.")
+    all_properties = get_all_properties(refresh=refresh_properties)
+    if not all_properties:
+        print("No properties found to run the report on.")
         return
 
-    # Create a single report_data dictionary with the aggregated data
-    aggregated_report_data = {
-        "title": "Session Source / Medium Report (All Properties)",
-        "headers": headers,
-        "rows": aggregated_rows,
-        "date_range": verbose_date_range_str,
-    }
+    # Use default date range (Last Calendar Month)
+    start_date, end_date, _, verbose_date_range_str = get_selected_date_range()
 
+    aggregated_title = "Session Source / Medium Report (All Properties)"
     # Create a generic selected_property_info for the output filename
     selected_property_info = {
         "display_name": "All-Properties",
         "property_id": "all"
     }
 
-    output_function(aggregated_report_data, selected_property_info, start_date, end_date)
+    csv_file, csv_writer, csv_filepath = None, None, None
+    headers, column_types = None, None
+    row_total = 0
+    properties_written = 0
+    rollup_totals = {} # rollup column -> {column value: [metric sums]}
+    rollup_metric_headers, rollup_metric_types = [], []
+
+    # Run the properties concurrently with a bounded pool of worker threads. Each property is
+    # written as soon as it finishes, so the aggregated rows follow the order properties complete in.
+    workers = max(1, workers)
+    print(f"Using {workers} worker(s) for {len(all_properties)} properties.")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = _iter_completed(
+                executor,
+                lambda prop_info: _run_report_for_property(prop_info, start_date, end_date, no_cache=no_cache),
+                all_properties,
+                workers
+            )
+
+            for prop_info, report_data in results:
+                if not report_data or not report_data['rows']:
+                    print(f"No data returned for {prop_info['display_name']}.")
+                    continue
+                table = report_table.ReportTable.from_report_data(report_data)
+
+                if csv_file is None:
+                    # The first property with data fixes the columns of the aggregated report
+                    headers = ["property_name"] + table.headers
+                    column_types = ["string"] + table.column_types
+                    try:
+                        csv_file, csv_writer, csv_filepath = output_manager.open_csv_for_append(
+                            {"title": aggregated_title, "headers": headers}, selected_property_info, start_date, end_date
+                        )
+                    except OSError as e:
+                        print(f"Error creating the aggregated CSV file: {e}")
+                        return
+                    rollup_metric_headers = report_table.rollup_metric_headers(table)
+                    rollup_metric_types = [table.column_types[table.headers.index(header)] for header in rollup_metric_headers]
+                    rollup_totals = {rollup: {} for rollup in valid_rollups if rollup in table.headers}
+
+                if table.headers != headers[1:]:
+                    print(f"Skipping {prop_info['display_name']}: its columns don't match the other properties.")
+                    continue
+
+                property_name = prop_info['display_name']
+                with profiler.phase("output"):
+                    csv_writer.writerows([property_name] + row for row in table.iter_rows())
+                    csv_file.flush() # Finished properties are on disk even if a later one crashes the run
+                row_total += table.row_total
+                properties_written += 1
 
+                for rollup, totals in rollup_totals.items():
+                    report_table.add_to_rollup(totals, table, rollup, rollup_metric_headers)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+
+    if csv_file is None:
+        print("No data to generate a report.")
+        return
+    print(f"Successfully saved report to {csv_filepath} ({row_total} rows from {properties_written} properties)")
+
+    # The HTML report reads its rows back from the CSV, so they are never all held in memory
+    with profiler.phase("output"):
+        output_manager.save_to_html({
+            "title": aggregated_title,
+            "headers": headers,
+            "column_types": column_types,
+            "rows": output_manager.CsvFileRows(csv_filepath, row_total),
+            "date_range": verbose_date_range_str,
+        }, selected_property_info, start_date, end_date)
+
+    for rollup, totals in rollup_totals.items():
+        rollup_report_data = report_table.rollup_table(
+            f"{aggregated_title} by {rollup}", rollup, rollup_metric_headers, rollup_metric_types, totals
+        )
+        rollup_report_data['date_range'] = verbose_date_range_str
+        with profiler.phase("output"):
+            output_manager.save_to_csv_and_html(rollup_report_data, selected_property_info, start_date, end_date)
+
+    pool_stats = ga4_client.get_pool_stats()
+    print(f"\nClient pool: {pool_stats['channels_created']} channel(s) created, {pool_stats['channels_reused']} reused.")
+    quota_stats = quota_manager.get_quota_stats()
+    print(f"API requests: {quota_stats['requests']} sent, {quota_stats['retries']} retried, {quota_stats['throttled_waits']} held back by the quota limiter.")
     print("\nFinished running aggregated report for all properties.")
 
+def _report_entry(report_data):
+    """Returns report data in the JSON form the report server sends: a columnar table, or the report dictionary itself."""
+    if isinstance(report_data, report_table.ReportTable):
+        return report_data.to_cache()
+    return report_data
+
+def serve_report_request(params):
+    """
+    Runs the reports asked for in a report server request (see report_server.py) and returns the response.
+    params holds property_id, report (one name or several comma-separated), either start_date and end_date
+    or last_complete_months, and optionally no_cache. Reports the server answered recently come from its
+    in-memory store; the rest run together through the report cache, exactly like a command-line run.
+    """
+    # Imported here (and in _serve) so ordinary runs don't load http.server
+    import report_server
+
+    property_id = str(params.get("property_id") or "")
+    selected_reports = _get_reports_by_names(str(params.get("report") or ""))
+    if not property_id or not selected_reports:
+        raise report_server.ReportRequestError(f"A property_id and valid report name(s) are required (got property_id '{property_id}', report '{params.get('report')}').")
+    selected_property_info = get_property_info_by_id(property_id)
+    if not selected_property_info:
+        raise report_server.ReportRequestError(f"Property ID '{property_id}' was not found or isn't accessible.")
+
+    months = None
+    last_complete_months = params.get("last_complete_months")
+    if last_complete_months is not None:
+        if not isinstance(last_complete_months, int) or last_complete_months < 1:
+            raise report_server.ReportRequestError("last_complete_months must be a whole number of at least 1.")
+        months, start_date, end_date, verbose_date_range_str = _get_last_complete_months(last_complete_months)
+    else:
+        date_args = _get_dates_from_args(params.get("start_date"), params.get("end_date"))
+        if not date_args:
+            raise report_server.ReportRequestError("start_date and end_date (YYYY-MM-DD), or last_complete_months, are required.")
+        start_date, end_date, _, verbose_date_range_str = date_args
+
+    no_cache = bool(params.get("no_cache"))
+    reports = {}
+    pending_reports = [] # (report module name, result key) of the reports that have to run
+    for selected_report in selected_reports:
+        result_key = (property_id, selected_report['module'], start_date, end_date, tuple(months or ()))
+        stored_result = None if no_cache else report_server.get_result(result_key)
+        if stored_result is not None:
+            print(f"Serving '{selected_report['name']}' for property ID {property_id} from memory.")
+            reports[selected_report['module']] = stored_result
+        else:
+            pending_reports.append((selected_report['module'], result_key))
+
+    if pending_reports:
+        if months:
+            reports_data = {
+                report_module_name: run_monthly_report(report_module_name, property_id, months, no_cache=no_cache)
+                for report_module_name, _ in pending_reports
+            }
+        else:
+            reports_data = run_dynamic_reports([report_module_name for report_module_name, _ in pending_reports], property_id, start_date, end_date, no_cache=no_cache)
+        # Results are kept in memory as long as the report cache would keep them
+        ttl = cache_store.ttl_for_end_date(end_date)
+        for report_module_name, result_key in pending_reports:
+            report_data = reports_data.get(report_module_name)
+            if not report_data:
+                reports[report_module_name] = None
+                continue
+            # Monthly reports produce one table per metric; every other report is a single table
+            result = [_report_entry(table) for table in report_data] if isinstance(report_data, list) else _report_entry(report_data)
+            report_server.put_result(result_key, result, ttl=ttl)
+            reports[report_module_name] = result
+
+    return {
+        "property": selected_property_info,
+        "start_date": start_date,
+        "end_date": end_date,
+        "date_range": verbose_date_range_str,
+        "reports": reports,
+    }
+
+def _serve(args):
+    """Loads the API clients and the property catalogue once, then answers report requests until interrupted."""
+    import report_server
+
+    print("Starting the report server: loading the API clients and the property catalogue...")
+    if not ga4_client.get_data_client():
+        return
+    property_catalogue.get_catalogue(refresh=args.refresh_properties)
+    report_server.serve(serve_report_request, port=args.port)
+
 def get_next_action():
     """Waits for a single key press and returns the selected action."""
     print("Enter your choice: ", end="", flush=True)
@@ -431,20 +817,69 @@ def get_next_action():
 
 def main():
     """Main function to orchestrate the interactive reporting session."""
-    _cleanup_cache() # Clean up stale cache files at the start of each session
-
     parser = argparse.ArgumentParser(description='Run Google Analytics 4 reports.')
     parser.add_argument('-p', '--property-id', type=str, help='Specify a GA4 property ID to run reports non-interactively.')
-    parser.add_argument('-r', '--report', type=str, help='Specify the report name (e.g., "top_cities_report") to run non-interactively.')
+    parser.add_argument('-r', '--report', type=str, help='Specify the report name (e.g., "top_cities_report"), or several comma-separated names, to run non-interactively.')
     parser.add_argument('-sd', '--start-date', type=str, help='Specify the start date for the report in YYYY-MM-DD format.')
     parser.add_argument('-ed', '--end-date', type=str, help='Specify the end date for the report in YYYY-MM-DD format.')
-    parser.add_argument('-o', '--output-format', type=str, choices=['console', 'csv', 'html', 'csv_html'], help='Specify the output format (console, csv, html, csv_html) for non-interactive mode.')
+    parser.add_argument('-o', '--output-format', type=str, choices=['console', 'csv', 'html', 'csv_html', 'jsonl', 'jsonl_stdout', 'csv_gz', 'parquet', 'arrow'], help='Specify the output format (console, csv, html, csv_html, jsonl, jsonl_stdout, csv_gz, parquet, arrow) for non-interactive mode. parquet and arrow need the optional pyarrow package.')
     parser.add_argument('--run-all-properties-report', action='store_true', help='Run the Session Source / Medium report for all available properties.')
     parser.add_argument('--no-cache', action='store_true', help='Force a fresh run of the report, ignoring any cached results.')
+    parser.add_argument('--workers', type=int, default=ALL_PROPERTIES_WORKERS, help=f'Number of properties to run concurrently with --run-all-properties-report (default: {ALL_PROPERTIES_WORKERS}).')
+    parser.add_argument('--stream', action='store_true', help='Page through the report and print rows to the console or write them straight to a CSV, JSON Lines, Parquet or Arrow file as they arrive, without caching.')
+    parser.add_argument('--last-complete-months', type=int, metavar='N', help='Report the last N complete calendar months side by side, one column per month. Closed months are cached permanently, so later runs only fetch new months.')
+    parser.add_argument('--head', type=int, metavar='N', help='Print only the first N rows of each report to the console.')
+    parser.add_argument('--no-pager', action='store_true', help='Print console output straight to the terminal instead of through a pager ($PAGER, less or more) when it is longer than the screen.')
+    parser.add_argument('--rollup', action='append', metavar='COLUMN', help='With --run-all-properties-report, also total the metrics by this column across all properties (e.g. sessionSourceMedium). Can be given more than once.')
+    parser.add_argument('--profile', action='store_true', help='Print where the run spent its time when it finishes: per-phase wall time, API latency percentiles, rows per second, cache hits/misses/stale and peak memory (traced with tracemalloc, which slows the run a little).')
+    parser.add_argument('--metrics-file', type=str, metavar='PATH', help='Write the same measurements as --profile to PATH when the run finishes: a Prometheus textfile if PATH ends in .prom, otherwise JSON.')
+    parser.add_argument('--record', type=str, metavar='DIR', help='Save every Admin and Data API request and response to the cassette directory DIR, for replaying later with --replay. Add --no-cache and --refresh-properties to capture every call.')
+    parser.add_argument('--replay', type=str, metavar='DIR', help='Answer every Admin and Data API call from a cassette recorded with --record, offline and without credentials.')
+    parser.add_argument('--refresh-properties', action='store_true', help='Reload the list of accounts and properties from the Admin API instead of the cached catalogue.')
+    parser.add_argument('--serve', action='store_true', help='Run as a long-lived report server on localhost, keeping the API clients, property catalogue and recent reports in memory. Submit reports to it with report_client.py.')
+    parser.add_argument('--port', type=int, default=SERVE_PORT, help=f'Port the report server listens on with --serve (default: {SERVE_PORT}).')
     args = parser.parse_args()
+    if args.last_complete_months is not None and args.last_complete_months < 1:
+        parser.error("--last-complete-months must be at least 1.")
+    if args.head is not None and args.head < 0:
+        parser.error("--head can't be negative.")
+    if args.record and args.replay:
+        parser.error("--record and --replay can't be used together.")
+    if args.rollup and not args.run_all_properties_report:
+        parser.error("--rollup only applies to --run-all-properties-report.")
+    if args.serve and (args.run_all_properties_report or args.stream):
+        parser.error("--serve can't be combined with --run-all-properties-report or --stream.")
+    if args.output_format == "jsonl_stdout":
+        # stdout carries only the JSON Lines rows, so progress and status messages go to stderr
+        sys.stdout = sys.stderr
+
+    if args.profile or args.metrics_file:
+        profiler.start(trace_memory=True)
+    if args.replay:
+        try:
+            ga4_client.start_replay(args.replay)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return
+    elif args.record:
+        ga4_client.start_recording(args.record)
+    try:
+        with profiler.phase("cache_cleanup"):
+            _cleanup_cache() # Clean up stale cache entries at the start of each session
+        if args.serve:
+            _serve(args)
+        else:
+            _run_session(args)
+    finally:
+        if args.profile:
+            profiler.print_summary()
+        if args.metrics_file:
+            profiler.write_metrics_file(args.metrics_file)
 
+def _run_session(args):
+    """Runs the reports chosen on the command line or interactively until the user quits."""
     if args.run_all_properties_report:
-        run_report_for_all_properties(no_cache=args.no_cache)
+        run_report_for_all_properties(no_cache=args.no_cache, workers=args.workers, refresh_properties=args.refresh_properties, rollups=args.rollup)
         return
 
     while True: # Main loop for selecting properties
@@ -452,18 +887,21 @@ def main():
         selected_property_info = None
         if args.property_id:
             print(f"Attempting to use property ID from command-line: {args.property_id}")
-            selected_property_info = get_property_info_by_id(args.property_id)
+            selected_property_info = get_property_info_by_id(args.property_id, refresh=args.refresh_properties)
             if not selected_property_info:
                 print("Invalid or inaccessible property ID provided via command-line. Falling back to interactive selection...")
                 # Clear args.property_id to force interactive mode
                 args.property_id = None 
         
         if not args.property_id: # If still no property from command line or it was invalid
-            selected_property_info = get_selected_property()
+            selected_property_info = get_selected_property(refresh=args.refresh_properties)
 
         if not selected_property_info:
             break # Exit if no property is selected or found
 
+        # The catalogue only needs refreshing once per session; later selections are served from memory
+        args.refresh_properties = False
+
         while True: # Nested loop for running reports on the selected property
             # 2. Discover and Select Report (interactive or via command-line arg)
             available_reports = get_available_reports()
@@ -471,22 +909,27 @@ def main():
                 print("No reports found in the 'reports' directory.")
                 break # Go back to property selection
             
-            selected_report = None
+            # Several reports can be given as a comma-separated list, e.g. -r top_pages_report,channel_overview_report
+            selected_reports = None
             if args.report:
-                selected_report = _get_report_by_name(args.report)
-                if not selected_report:
+                selected_reports = _get_reports_by_names(args.report)
+                if not selected_reports:
                     print(f"Invalid report name '{args.report}' provided via command-line. Falling back to interactive selection...")
                     args.report = None
             
             if not args.report: # If no report from command line or it was invalid
                 selected_report = get_selected_report(available_reports)
+                selected_reports = [selected_report] if selected_report else None
             
-            if not selected_report:
+            if not selected_reports:
                 break # Exit this loop if no report selected
 
             # 3. Select Date Range (interactive or via command-line arg)
             start_date, end_date, friendly_date_range_str, verbose_date_range_str = None, None, None, None
-            if args.start_date or args.end_date: # If any date arg is provided, try to use them
+            months = None
+            if args.last_complete_months:
+                months, start_date, end_date, verbose_date_range_str = _get_last_complete_months(args.last_complete_months)
+            elif args.start_date or args.end_date: # If any date arg is provided, try to use them
                 date_args = _get_dates_from_args(args.start_date, args.end_date)
                 if date_args:
                     start_date, end_date, friendly_date_range_str, verbose_date_range_str = date_args
@@ -496,36 +939,73 @@ def main():
             if not start_date: # If no dates from command line or they were invalid
                 start_date, end_date, friendly_date_range_str, verbose_date_range_str = get_selected_date_range()
 
-            # 4. Run the selected report
-            report_data = run_dynamic_report(
-                selected_report['module'], 
-                selected_property_info['property_id'], 
-                start_date, 
-                end_date,
-                no_cache=args.no_cache
-            )
-            
-            if not report_data:
-                print("Report generation failed.")
-                # Ask user what to do next even if report fails
+            # Streamed reports are written row by row, so only file formats that can be appended to are allowed
+            if args.stream and args.output_format not in STREAMING_OUTPUT_FORMATS:
+                print(f"Streaming writes to {', '.join(STREAMING_OUTPUT_FORMATS)}; using csv output.")
+                args.output_format = "csv"
+
+            # 4. Run the selected report(s), batched into as few API calls as possible
+            if months:
+                reports_data = {
+                    selected_report['module']: run_monthly_report(
+                        selected_report['module'],
+                        selected_property_info['property_id'],
+                        months,
+                        no_cache=args.no_cache
+                    )
+                    for selected_report in selected_reports
+                }
+            elif args.stream:
+                reports_data = {
+                    selected_report['module']: stream_dynamic_report(
+                        selected_report['module'],
+                        selected_property_info['property_id'],
+                        start_date,
+                        end_date
+                    )
+                    for selected_report in selected_reports
+                }
             else:
-                # Add verbose date range string to report data for output
-                report_data['date_range'] = verbose_date_range_str
-                # 5. Select Output Format and process the data (interactive or via command-line arg)
-                output_function = None
-                if args.output_format:
+                reports_data = run_dynamic_reports(
+                    [selected_report['module'] for selected_report in selected_reports],
+                    selected_property_info['property_id'], 
+                    start_date, 
+                    end_date,
+                    no_cache=args.no_cache
+                )
+            
+            output_function = None
+            for selected_report in selected_reports:
+                report_data = reports_data.get(selected_report['module'])
+                if not report_data:
+                    print(f"Report generation failed: {selected_report['name']}.")
+                    # Ask user what to do next even if report fails
+                    continue
+
+                # 5. Select Output Format once and process the data (interactive or via command-line arg)
+                if not output_function and args.output_format:
                     output_function = _get_output_function_from_args(args.output_format)
                     if not output_function:
                         print(f"Invalid output format '{args.output_format}' provided via command-line. Falling back to interactive selection...")
                 
                 if not output_function: # If no output from command line or it was invalid
                     output_function = get_selected_output_format()
+                output_function = _configure_console_output(output_function, args)
                 
-                # Pass all necessary info to the output function
-                output_function(report_data, selected_property_info, start_date, end_date) 
+                # Monthly reports produce one table per metric; every other report is a single table
+                for table in (report_data if isinstance(report_data, list) else [report_data]):
+                    # Add verbose date range string to report data for output
+                    table['date_range'] = verbose_date_range_str
+                    # Pass all necessary info to the output function
+                    with profiler.phase("output"):
+                        try:
+                            output_function(table, selected_property_info, start_date, end_date)
+                        except Exception as e:
+                            # Streamed rows are fetched while they are written, so API errors can surface here
+                            print(f"Output of {selected_report['name']} failed: {e}")
 
             # 6. Ask user what to do next - skip if all args provided (fully non-interactive)
-            if args.property_id and args.report and (args.start_date or args.end_date) and args.output_format:
+            if args.property_id and args.report and (args.start_date or args.end_date or args.last_complete_months) and args.output_format:
                 print("All arguments provided via command-line. Exiting non-interactive mode.")
                 return # Exit the entire script
 
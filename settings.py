@@ -9,4 +9,92 @@
 # 1 month = 2419200 seconds)
 CACHE_DURATION = 604800 
 
+# How long a cached report is kept depends on how final its data is, judged by the
+# report's end date (durations in seconds, None = keep until evicted):
+# - the range ends today (or later): GA4 is still collecting data, so refresh often,
+# - the range ends within GA4_PROCESSING_LAG_DAYS: data is mostly in but may still be revised,
+# - the range ended before that: the data is closed and won't change.
+# CACHE_DURATION still applies to entries saved without an end date.
+CACHE_TTL_TODAY = 3600 # 1 hour
+CACHE_TTL_PROCESSING_LAG = 21600 # 6 hours
+CACHE_TTL_CLOSED = None
+
+# Where cached reports are stored:
+# "sqlite"    - a single indexed file, cache/cache.sqlite3, with size-based LRU eviction (default),
+# "directory" - one JSON file per report in the cache directory.
+CACHE_BACKEND = "sqlite"
+
+# Size budget for the sqlite cache in bytes (compressed). Once it is exceeded the
+# least recently used entries are evicted. 0 disables the budget.
+CACHE_MAX_BYTES = 512 * 1024 * 1024 # 512 MB
+
+# Number of days GA4 may still be processing data for. Reports ending within this
+# many days of today are cached for CACHE_TTL_PROCESSING_LAG rather than as closed.
+GA4_PROCESSING_LAG_DAYS = 2
+
+# Number of rows requested per page from the Data API (the API allows up to 250,000).
+# Reports without a row limit page through all their rows in pages of this size.
+REPORT_PAGE_SIZE = 100000
+
+# How long the on-disk catalogue of accounts and properties is trusted, in seconds
+# (default 1 day). Use --refresh-properties to force a fresh load.
+PROPERTY_CACHE_DURATION = 86400
+
+# How accounts and properties are enumerated from the Admin API:
+# "summaries"  - a single paged account summaries listing (fastest, default),
+# "parallel"   - list accounts, then page each account's properties concurrently,
+# "sequential" - list accounts, then each account's properties one after another.
+PROPERTY_ENUMERATION_METHOD = "summaries"
+
+# Number of accounts listed concurrently by the "parallel" enumeration method.
+PROPERTY_ENUMERATION_WORKERS = 8
+
+# Number of properties to run concurrently with --run-all-properties-report.
+# Can be overridden on the command line with --workers.
+ALL_PROPERTIES_WORKERS = 8
+
+# Data API requests that fail with a retryable error (quota exhausted, service unavailable,
+# deadline exceeded) are retried up to API_MAX_ATTEMPTS times in total, waiting a random
+# time of up to API_BACKOFF_BASE_SECONDS * 2^retry (capped at API_BACKOFF_MAX_SECONDS) between tries.
+API_MAX_ATTEMPTS = 5
+API_BACKOFF_BASE_SECONDS = 1
+API_BACKOFF_MAX_SECONDS = 32
+
+# Most Data API requests allowed in flight at once for one property (GA4 allows 10 for
+# standard properties). The limit is lowered automatically when the quota reported with
+# each response can't pay for that many requests, and halved after a quota error.
+PROPERTY_MAX_CONCURRENT_REQUESTS = 10
+
+# Most Data API requests allowed in flight at once across all properties. Lowered the same
+# way when this project's share of the hourly tokens (tokens per project per property per
+# hour) runs low, so runs over many properties throttle as a whole rather than per property.
+PROJECT_MAX_CONCURRENT_REQUESTS = 20
+
+# HTML reports with at least this many rows embed their rows as compact JSON and page
+# through them in the browser, instead of writing every row as a <tr>. This keeps large
+# files small and quick to open. None always writes a plain table.
+HTML_EMBED_JSON_MIN_ROWS = 5000
+
+# Rows shown per page in HTML reports that embed their rows as JSON.
+HTML_PAGE_SIZE = 100
+
+# Rows converted per chunk when a streamed report is written as Parquet or Arrow.
+# Each chunk becomes one Parquet row group / Arrow record batch.
+EXPORT_CHUNK_ROWS = 50000
+
+# Report server started with --serve (see report_server.py) and used by report_client.py.
+# It has no authentication, so keep SERVE_HOST on localhost. SERVE_PORT can be overridden
+# with --port on both sides.
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+
+# Most reports, and most bytes of reports (measured as the JSON sent to clients), the report
+# server keeps in memory; the least recently used are dropped first once either is exceeded.
+# Entries also expire like the report cache (CACHE_TTL_TODAY etc.), by their end date.
+SERVE_RESULT_CACHE_ENTRIES = 256
+SERVE_RESULT_CACHE_BYTES = 256 * 1024 * 1024 # 256 MB
+
+# How long report_client.py waits for the server to answer, in seconds.
+SERVE_CLIENT_TIMEOUT_SECONDS = 600
+
 # Add other configurable settings here as needed.